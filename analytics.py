@@ -0,0 +1,322 @@
+"""Ticket-level reporting over a squad's tickets loaded into numpy columns.
+
+Ticket types are categorical codes, labels and projects are bitmasks and dates are epoch seconds, so every report is a
+handful of `np.bincount` group-bys over the same columns rather than another query or a pass over ORM objects.
+"""
+
+from typing import Iterator, NamedTuple
+
+import numpy as np
+from sqlalchemy import select
+
+from db.base import query_budget
+from db.session import Session
+from jira.references import JiraSquadID, ProductLabel, TechLabel
+from jira.ticket import get_squad_projects
+from models.sprint import Sprint
+from models.ticket import Ticket, project_ticket
+
+# datetime64's NaT, which is what a missing date string parses to
+MISSING_DATE = np.iinfo(np.int64).min
+# Projects share one int64 bitmask per ticket
+MAX_SQUAD_PROJECTS = 63
+# Ticket detail rows built per pass over the table
+TICKET_DETAIL_CHUNK_SIZE = 10000
+# The backlog sheet names the security breakdown after secops, every other category column is shared with sprints
+BACKLOG_CATEGORY_KEYS = {"security_tickets": "secops_tickets"}
+# Backlog group codes, tickets whose refinement is unknown only count towards the backlog total
+REFINED_GROUPS = {"refined": "True", "unrefined": "False"}
+
+
+class TicketTable(NamedTuple):
+    squad_id: JiraSquadID
+    # Row metadata for the sprint codes and project bits
+    sprints: list
+    project_names: list
+    ticket_types: list
+    # One entry per ticket, ordered by ticket id
+    jira_refs: np.ndarray
+    type_codes: np.ndarray
+    sprint_codes: np.ndarray
+    tech_labels: np.ndarray
+    product_labels: np.ndarray
+    project_bits: np.ndarray
+    story_points: np.ndarray
+    created_dates: np.ndarray
+    completed_dates: np.ndarray
+    backlog: np.ndarray
+    refined_codes: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.jira_refs)
+
+    def is_type(self, ticket_type: str) -> np.ndarray:
+        if ticket_type not in self.ticket_types:
+            return np.zeros(len(self), dtype=bool)
+
+        return self.type_codes == self.ticket_types.index(ticket_type)
+
+    def in_project(self, project_name: str) -> np.ndarray:
+        return (self.project_bits & (1 << self.project_names.index(project_name))) != 0
+
+
+def to_epoch_seconds(date_strings: list) -> np.ndarray:
+    return np.array(date_strings, dtype="datetime64[s]").astype(np.int64)
+
+
+def to_date_strings(epoch_seconds: np.ndarray) -> list:
+    # np.char fails on empty arrays under numpy 2
+    if not len(epoch_seconds):
+        return []
+
+    date_strings = np.char.replace(np.datetime_as_string(epoch_seconds.astype("datetime64[s]")), "T", " ")
+    return np.where(epoch_seconds == MISSING_DATE, None, date_strings.astype(object)).tolist()
+
+
+def to_codes(values: list, categories: list) -> np.ndarray:
+    """Index of each value in `categories`, or -1 when it isn't one"""
+    category_codes = {category: code for code, category in enumerate(categories)}
+    return np.array([category_codes.get(value, -1) for value in values], dtype=np.int32)
+
+
+# The squad's sprints, projects and tickets, then the squad's project memberships
+@query_budget(4)
+def load_ticket_table(squad_id: JiraSquadID) -> TicketTable:
+    sprint_query = (
+        select(
+            Sprint.id,
+            Sprint.name,
+            Sprint.goal,
+            Sprint.start_date,
+            Sprint.end_date,
+            Sprint.tickets_carried_over,
+            Sprint.defect_total,
+        )
+        .where(Sprint.squad_id == squad_id)
+        .order_by(Sprint.id)
+    )
+    ticket_query = (
+        select(
+            Ticket.id,
+            Ticket.jira_ref,
+            Ticket.ticket_type,
+            Ticket.sprint_id,
+            Ticket.tech_labels,
+            Ticket.product_labels,
+            Ticket.story_points,
+            Ticket.ticket_created_date,
+            Ticket.ticket_specific_completed_date,
+            Ticket.backlog,
+            Ticket.refined,
+        )
+        .where(Ticket.squad_id == squad_id)
+        .order_by(Ticket.id)
+    )
+    project_ticket_query = (
+        select(project_ticket.c.project_id, project_ticket.c.ticket_id)
+        .join(Ticket, Ticket.id == project_ticket.c.ticket_id)
+        .where(Ticket.squad_id == squad_id)
+    )
+    with Session() as session:
+        sprints = session.execute(sprint_query).all()
+        projects = get_squad_projects(squad_id)
+        ticket_rows = session.execute(ticket_query).all()
+        project_tickets = session.execute(project_ticket_query).all()
+
+    if len(projects) > MAX_SQUAD_PROJECTS:
+        raise ValueError(f"{squad_id} has {len(projects)} projects, a ticket table holds {MAX_SQUAD_PROJECTS} at most")
+
+    ticket_columns = list(zip(*ticket_rows)) if ticket_rows else [()] * len(ticket_query.selected_columns)
+    (
+        ids,
+        jira_refs,
+        ticket_types,
+        sprint_ids,
+        tech_labels,
+        product_labels,
+        story_points,
+        created_dates,
+        completed_dates,
+        backlog,
+        refined,
+    ) = ticket_columns
+    ids = np.array(ids, dtype=np.int64)
+    type_categories = sorted(set(ticket_types))
+
+    project_bits = np.zeros(len(ids), dtype=np.int64)
+    if project_tickets:
+        project_ids, project_ticket_ids = (np.array(column, dtype=np.int64) for column in zip(*project_tickets))
+        project_positions = np.searchsorted(np.array([project.id for project in projects], dtype=np.int64), project_ids)
+        np.bitwise_or.at(project_bits, np.searchsorted(ids, project_ticket_ids), np.left_shift(1, project_positions))
+
+    return TicketTable(
+        squad_id=squad_id,
+        sprints=sprints,
+        project_names=[project.name for project in projects],
+        ticket_types=type_categories,
+        jira_refs=np.array(jira_refs, dtype=object),
+        type_codes=to_codes(ticket_types, type_categories),
+        sprint_codes=to_codes(sprint_ids, [sprint.id for sprint in sprints]),
+        tech_labels=np.array(tech_labels, dtype=np.int64),
+        product_labels=np.array(product_labels, dtype=np.int64),
+        project_bits=project_bits,
+        story_points=np.array(story_points, dtype=np.float64),
+        created_dates=to_epoch_seconds(created_dates),
+        completed_dates=to_epoch_seconds(completed_dates),
+        backlog=np.array(backlog, dtype=object) == "True",
+        refined_codes=to_codes(refined, list(REFINED_GROUPS.values())),
+    )
+
+
+def count_breakdown(group_codes: np.ndarray, group_count: int, columns: dict) -> dict:
+    """Per group, the number of tickets matching each column's mask. Tickets with a negative group code are left out.
+
+    Any mask over the table's columns makes a new report column, e.g. grouping
+    `{"big_bugs": table.is_type("bug") & (table.story_points > 5)}` by `table.sprint_codes`.
+    """
+    in_group = group_codes >= 0
+    return {
+        name: np.bincount(group_codes[in_group & mask], minlength=group_count).tolist()
+        for name, mask in columns.items()
+    }
+
+
+def type_count_columns(table: TicketTable) -> dict:
+    return {
+        "user_story_count": table.is_type("user_story"),
+        "investigation_count": table.is_type("investigation"),
+        "bug_count": table.is_type("bug"),
+    }
+
+
+def category_and_project_count_columns(table: TicketTable) -> dict:
+    """Masks for the category/project breakdown, keyed by report column name"""
+    columns = {project_name: table.in_project(project_name) for project_name in table.project_names}
+    columns.update(
+        {
+            "tech_tickets": table.tech_labels != 0,
+            "security_tickets": (table.tech_labels & TechLabel.SECURITY) != 0,
+            "devops_tickets": (table.tech_labels & TechLabel.DEVOPS) != 0,
+            "misc_technical_tickets": (table.tech_labels & TechLabel.MISC_TECH) != 0,
+            "product_tickets": table.product_labels != 0,
+            "bau_product": (table.product_labels & ProductLabel.BAU_PRODUCT) != 0,
+            "project": (table.product_labels & ProductLabel.PROJECT) != 0,
+        }
+    )
+    return columns
+
+
+def sprint_breakdown(table: TicketTable) -> list:
+    """One row per sprint, sprints with no tickets still get a row of zeros"""
+    category_columns = category_and_project_count_columns(table)
+    counts = count_breakdown(
+        table.sprint_codes,
+        len(table.sprints),
+        {"ticket_total": ~table.is_type("defect"), **type_count_columns(table), **category_columns},
+    )
+
+    squad_data = []
+    for position, sprint in enumerate(table.sprints):
+        sprint_info = {
+            "name": sprint.name,
+            "goal": sprint.goal,
+            "start_date": sprint.start_date,
+            "end_date": sprint.end_date,
+            "ticket_total": counts["ticket_total"][position],
+            "ticket_carry_over_count": sprint.tickets_carried_over,
+            "user_story_count": counts["user_story_count"][position],
+            "investigation_count": counts["investigation_count"][position],
+            "bug_count": counts["bug_count"][position],
+            "defect_count": sprint.defect_total,
+        }
+        sprint_info.update({name: counts[name][position] for name in category_columns})
+        squad_data.append(sprint_info)
+
+    return squad_data
+
+
+def backlog_breakdown(table: TicketTable) -> list:
+    """A single row for the squad's backlog, split into refined and unrefined tickets"""
+    category_columns = category_and_project_count_columns(table)
+    backlog_codes = np.where(table.backlog, table.refined_codes, -1)
+    counts = count_breakdown(
+        backlog_codes,
+        len(REFINED_GROUPS),
+        {"ticket_total": table.backlog, **type_count_columns(table), **category_columns},
+    )
+
+    backlog_info = {"squad": int(table.squad_id), "ticket_total": int(np.count_nonzero(table.backlog))}
+    for position, refined_prefix in enumerate(REFINED_GROUPS):
+        for name in ["ticket_total", "user_story_count", "investigation_count", "bug_count"]:
+            backlog_info[f"{refined_prefix}_{name}"] = counts[name][position]
+
+    for position, refined_prefix in enumerate(REFINED_GROUPS):
+        for name in category_columns:
+            backlog_info[f"{refined_prefix}_{BACKLOG_CATEGORY_KEYS.get(name, name)}"] = counts[name][position]
+
+    return [backlog_info]
+
+
+def bitmask_names(bitmasks: np.ndarray, names: list) -> np.ndarray:
+    """Comma separated names of the set bits, worked out once per distinct bitmask and shared between tickets"""
+    distinct_bitmasks, codes = np.unique(bitmasks, return_inverse=True)
+    distinct_names = np.array(
+        [
+            ", ".join(name for bit, name in enumerate(names) if bitmask & 1 << bit)
+            for bitmask in distinct_bitmasks.tolist()
+        ],
+        dtype=object,
+    )
+    return distinct_names[codes]
+
+
+def to_story_points(story_points: np.ndarray) -> list:
+    return [
+        None if np.isnan(points) else int(points) if points.is_integer() else points for points in story_points.tolist()
+    ]
+
+
+class TicketDetailRows:
+    """The ticket detail sheet, one row per ticket for slicing the reports any other way in a spreadsheet.
+
+    Rows are built from the table's columns a chunk at a time on every pass, so the digest, the workbook and each
+    export can all read the sheet without a dict per ticket ever being held in memory.
+    """
+
+    def __init__(self, table: TicketTable):
+        self.table = table
+        # Code -1 picks the trailing None
+        self.sprint_names = np.array([sprint.name for sprint in table.sprints] + [None], dtype=object)
+        self.ticket_types = np.array(table.ticket_types, dtype=object)
+        self.tech_labels = bitmask_names(table.tech_labels, [label.name.lower() for label in TechLabel])
+        self.product_labels = bitmask_names(table.product_labels, [label.name.lower() for label in ProductLabel])
+        self.projects = bitmask_names(table.project_bits, table.project_names)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __iter__(self) -> Iterator[dict]:
+        for chunk_start in range(0, len(self), TICKET_DETAIL_CHUNK_SIZE):
+            columns = self.chunk_columns(slice(chunk_start, chunk_start + TICKET_DETAIL_CHUNK_SIZE))
+            for values in zip(*columns.values()):
+                yield dict(zip(columns, values))
+
+    def chunk_columns(self, chunk: slice) -> dict:
+        table = self.table
+        return {
+            "jira_ref": table.jira_refs[chunk].tolist(),
+            "ticket_type": self.ticket_types[table.type_codes[chunk]].tolist(),
+            "sprint": self.sprint_names[table.sprint_codes[chunk]].tolist(),
+            "backlog": table.backlog[chunk].tolist(),
+            "refined": (table.refined_codes[chunk] == 0).tolist(),
+            "story_points": to_story_points(table.story_points[chunk]),
+            "created_date": to_date_strings(table.created_dates[chunk]),
+            "completed_date": to_date_strings(table.completed_dates[chunk]),
+            "tech_labels": self.tech_labels[chunk].tolist(),
+            "product_labels": self.product_labels[chunk].tolist(),
+            "projects": self.projects[chunk].tolist(),
+        }
+
+
+def ticket_detail(table: TicketTable) -> TicketDetailRows:
+    return TicketDetailRows(table)
@@ -0,0 +1,102 @@
+"""Compares the ORM `add_all` ingestion path against the bulk Core upsert path on a synthetic ticket load.
+
+Run from the repo root: `python -m benchmarks.ingest --tickets 50000`
+"""
+
+import os
+import tempfile
+import time
+
+import click
+
+# The engine is created at import time from settings, so point it at a scratch file before anything imports db.base
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "ingest_benchmark.sqlite3")
+
+from db.base import engine, recreate_db  # noqa: E402
+from db.ingest import update_sprint_totals, upsert_tickets  # noqa: E402
+from db.session import Session  # noqa: E402
+from models.sprint import Sprint  # noqa: E402
+from models.ticket import Ticket  # noqa: E402
+
+SQUAD_ID = 126
+
+
+def build_ticket_rows(ticket_count: int, sprint_size: int) -> list:
+    return [
+        {
+            "squad_id": SQUAD_ID,
+            "jira_id": 10000 + i,
+            "jira_ref": f"BNK-{10000 + i}",
+            "ticket_type": ["user_story", "bug", "investigation"][i % 3],
+            "ticket_created_date": "2022-03-01 10:00:00",
+            "story_points": i % 8,
+            "ticket_specific_completed_date": "2022-03-04 10:00:00",
+            "ticket_sprint_completed_date": "2022-03-14 00:00:00",
+            "sprint_id": i // sprint_size + 1,
+            "tech_labels": 1 if i % 4 == 0 else 0,
+            "product_labels": 0 if i % 4 == 0 else 1,
+            "projects": [],
+            "refined": "True",
+            "backlog": "False",
+        }
+        for i in range(ticket_count)
+    ]
+
+
+def setup_sprints(sprint_count: int) -> None:
+    recreate_db()
+    with Session() as session:
+        session.add_all(
+            [Sprint(id=i + 1, squad_id=SQUAD_ID, jira_id=i + 1, name=f"Sprint {i + 1}") for i in range(sprint_count)]
+        )
+        session.commit()
+
+
+def ingest_with_orm(rows: list, sprint_size: int) -> None:
+    # Mirrors the old path: ORM objects, one session and commit per sprint
+    for batch_start in range(0, len(rows), sprint_size):
+        with Session() as session:
+            session.add_all(
+                [
+                    Ticket(**{column: value for column, value in row.items() if column != "projects"})
+                    for row in rows[batch_start : batch_start + sprint_size]
+                ]
+            )
+            sprint = session.get(Sprint, rows[batch_start]["sprint_id"])
+            sprint.defect_total = 0
+            sprint.tickets_carried_over = 0
+            session.commit()
+
+
+def ingest_with_upsert(rows: list, sprint_size: int) -> None:
+    with engine.begin() as connection:
+        for batch_start in range(0, len(rows), sprint_size):
+            upsert_tickets(connection, rows[batch_start : batch_start + sprint_size])
+            update_sprint_totals(connection, rows[batch_start]["sprint_id"], 0, 0)
+
+
+def time_ingest(name: str, ingest, rows: list, sprint_size: int) -> float:
+    setup_sprints(len(rows) // sprint_size + 1)
+    start = time.perf_counter()
+    ingest(rows, sprint_size)
+    elapsed = time.perf_counter() - start
+    print(f"{name}: {elapsed:.2f}s ({len(rows) / elapsed:,.0f} tickets/s)")
+    return elapsed
+
+
+@click.command()
+@click.option("--tickets", default=50000, show_default=True, help="Number of synthetic tickets to ingest.")
+@click.option("--sprint-size", default=50, show_default=True, help="Tickets per sprint.")
+def run_benchmark(tickets: int, sprint_size: int):
+    rows = build_ticket_rows(tickets, sprint_size)
+    orm_time = time_ingest("ORM add_all", ingest_with_orm, rows, sprint_size)
+    upsert_time = time_ingest("Core upsert", ingest_with_upsert, rows, sprint_size)
+
+    start = time.perf_counter()
+    ingest_with_upsert(rows, sprint_size)
+    print(f"Core upsert, re-ingesting existing tickets: {time.perf_counter() - start:.2f}s")
+    print(f"Speed up: {orm_time / upsert_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,134 @@
+"""Synthetic Jira payloads, shaped like the agile sprint/issue/backlog responses, for the benchmark suite"""
+
+import random
+
+import pendulum
+
+from jira.references import SPRINT_JIRA_FIELD, STORY_POINT_JIRA_FIELD, TECHNICAL_TICKET_LABEL_LIST, JiraSquadID
+from jira.registry import squad_registry
+
+FIRST_SPRINT_START = pendulum.datetime(2021, 1, 4)
+SPRINT_LENGTH_DAYS = 14
+
+# Weighted so most issues are stories, with a sprinkling of the types sprint ingestion skips
+SPRINT_ISSUE_TYPES = ["Story"] * 6 + ["Bug"] * 2 + ["Task", "Sub-task"]
+# Backlog ingestion only skips sub-tasks, anything else unexpected prints an alert per issue
+BACKLOG_ISSUE_TYPES = ["Story"] * 6 + ["Bug"] * 3 + ["Sub-task"]
+PRODUCT_LABELS = ["frontend", "backend", "ux", "customer", "reporting", "performance"]
+COMPONENTS = [
+    "API v2.0 Banking Release",
+    "API v2.0 Consumer Release",
+    "Data Warehouse",
+    "Hermes",
+    "Midas",
+    "Harmonia",
+]
+
+
+def jira_datetime(date: pendulum.DateTime) -> str:
+    return date.format("YYYY-MM-DDTHH:mm:ss.SSSZZ")
+
+
+def build_sprint(squad_id: JiraSquadID, sprint_number: int) -> dict:
+    start_date = FIRST_SPRINT_START.add(days=SPRINT_LENGTH_DAYS * sprint_number)
+    return {
+        "id": squad_id * 100000 + sprint_number,
+        "state": "closed",
+        "name": f"{squad_id.name.title()} Sprint {sprint_number + 1}",
+        "goal": f"Deliver increment {sprint_number + 1}",
+        "startDate": jira_datetime(start_date),
+        "endDate": jira_datetime(start_date.add(days=SPRINT_LENGTH_DAYS)),
+    }
+
+
+def build_issue(
+    rng: random.Random,
+    squad_id: JiraSquadID,
+    issue_id: int,
+    sprints: list,
+    label_count: int,
+    component_count: int,
+    subtask_count: int,
+) -> dict:
+    issue_type = rng.choice(SPRINT_ISSUE_TYPES if sprints else BACKLOG_ISSUE_TYPES)
+    summary = f"Synthetic issue {issue_id}"
+    if rng.random() < 0.1:
+        summary = f"Investigate {summary.lower()}"
+
+    labels = rng.sample(PRODUCT_LABELS + TECHNICAL_TICKET_LABEL_LIST, rng.randint(0, label_count))
+    components = [{"name": name} for name in rng.sample(COMPONENTS, rng.randint(0, component_count))]
+    subtasks = [
+        {"fields": {"issuetype": {"name": rng.choice(["Sub-task", "Defect"])}}}
+        for _ in range(rng.randint(0, subtask_count))
+    ]
+
+    created = FIRST_SPRINT_START.subtract(days=rng.randint(1, 30))
+    resolved = None
+    status = "To Do"
+    if sprints:
+        created = pendulum.parse(sprints[0]["startDate"]).subtract(days=rng.randint(1, 30))
+        resolved = jira_datetime(pendulum.parse(sprints[-1]["endDate"]).subtract(days=rng.randint(0, 10)))
+        status = "Done"
+
+    squad = squad_registry.get_squad(squad_id)
+    issue = {
+        "id": str(issue_id),
+        "key": f"{squad_id.name}-{issue_id}",
+        "fields": {
+            "issuetype": {"name": issue_type},
+            "summary": summary,
+            "labels": labels,
+            "components": components,
+            "created": jira_datetime(created),
+            "resolutiondate": resolved,
+            "status": {"name": status},
+            "subtasks": subtasks,
+            STORY_POINT_JIRA_FIELD: rng.choice([None, 1, 2, 3, 5, 8, 13]),
+            SPRINT_JIRA_FIELD: [{"id": sprint["id"], "name": sprint["name"]} for sprint in sprints] or None,
+        },
+    }
+    if squad.refined_field:
+        issue["fields"][squad.refined_field] = [{"value": rng.choice(["Yes", "No"])}]
+    else:
+        unrefined_sprint = {"id": 1, "name": squad.unrefined_sprint}
+        issue["fields"]["sprint"] = [unrefined_sprint] if rng.random() < 0.5 else None
+
+    return issue
+
+
+def build_squad_payloads(
+    squad_id: JiraSquadID,
+    sprint_count: int,
+    issues_per_sprint: int,
+    backlog_issues: int,
+    label_count: int = 3,
+    component_count: int = 2,
+    subtask_count: int = 3,
+    carry_over_rate: float = 0.1,
+    seed: int = 0,
+) -> dict:
+    """Closed sprints, the done issues listed for each sprint and the backlog for one squad.
+
+    Carried over issues are listed under every sprint they touched, as the agile sprint issue endpoint returns them.
+    """
+    rng = random.Random(seed + squad_id)
+    sprints = [build_sprint(squad_id, sprint_number) for sprint_number in range(sprint_count)]
+    sprint_issues = {sprint["id"]: [] for sprint in sprints}
+    issue_id = squad_id * 10000000
+    for sprint_number in range(sprint_count):
+        for _ in range(issues_per_sprint):
+            issue_id += 1
+            issue_sprints = [sprints[sprint_number]]
+            if sprint_number + 1 < sprint_count and rng.random() < carry_over_rate:
+                issue_sprints.append(sprints[sprint_number + 1])
+
+            issue = build_issue(rng, squad_id, issue_id, issue_sprints, label_count, component_count, subtask_count)
+            for sprint in issue_sprints:
+                sprint_issues[sprint["id"]].append(issue)
+
+    backlog = []
+    for _ in range(backlog_issues):
+        issue_id += 1
+        backlog.append(build_issue(rng, squad_id, issue_id, [], label_count, component_count, subtask_count))
+
+    return {"sprints": sprints, "sprint_issues": sprint_issues, "backlog": backlog}
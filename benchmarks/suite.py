@@ -0,0 +1,255 @@
+"""Times each stage of a metrics run on synthetic Jira payloads and compares the results against a saved baseline.
+
+Run from the repo root: `python -m benchmarks.suite --sprints 50 --issues-per-sprint 40 --save-baseline baseline.json`
+then `python -m benchmarks.suite --sprints 50 --issues-per-sprint 40 --baseline baseline.json` after a change.
+"""
+
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import click
+
+# The engine is created at import time from settings, so point it at a scratch file before anything imports db.base
+os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(), "suite_benchmark.sqlite3")
+
+from sqlalchemy import select  # noqa: E402
+
+from analytics import backlog_breakdown, load_ticket_table, sprint_breakdown, ticket_detail  # noqa: E402
+from benchmarks.payloads import build_squad_payloads  # noqa: E402
+from db.base import QueryCounter, engine, recreate_db  # noqa: E402
+from db.ingest import upsert_sprints  # noqa: E402
+from db.session import Session  # noqa: E402
+from excel import ReportWriter  # noqa: E402
+from jira.backlog import categorise_and_save_backlog_tickets  # noqa: E402
+from jira.references import JiraSquadID, SprintStatus  # noqa: E402
+from jira.registry import squad_registry  # noqa: E402
+from jira.ticket import categorise_and_save_sprint_tickets, categorise_ticket, get_ticket_type  # noqa: E402
+from jira_enums import Worksheets  # noqa: E402
+from models.sprint import Sprint  # noqa: E402
+from projects import setup_projects_in_db  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / 1024 / 1024 if sys.platform == "darwin" else peak_rss / 1024
+
+
+@contextmanager
+def timed_stage(results: dict, name: str, item_count: int):
+    with QueryCounter() as query_counter:
+        start = time.perf_counter()
+        yield
+        elapsed = time.perf_counter() - start
+
+    results[name] = {
+        "seconds": round(elapsed, 4),
+        "items": item_count,
+        "items_per_second": round(item_count / elapsed, 1) if elapsed else 0,
+        "queries": query_counter.count,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def sprint_rows(squad_id: JiraSquadID, sprints: list) -> list:
+    return [
+        {
+            "squad_id": squad_id,
+            "jira_id": sprint["id"],
+            "name": sprint["name"],
+            "goal": sprint["goal"],
+            "start_date": sprint["startDate"],
+            "end_date": sprint["endDate"],
+            "status": SprintStatus.CLOSED,
+        }
+        for sprint in sprints
+    ]
+
+
+def run_categorise_ticket(payloads: dict) -> None:
+    for squad_id, squad_payloads in payloads.items():
+        for sprint_number, issues in enumerate(squad_payloads["sprint_issues"].values()):
+            sprint = Sprint(id=sprint_number + 1, end_date="2022-01-01 00:00:00")
+            for issue in issues:
+                # Same skips as ingestion, categorise_ticket alerts on any type it doesn't report on
+                if get_ticket_type(issue) not in ["sub-task", "defect", "task"]:
+                    categorise_ticket(issue, sprint, squad_id, from_backlog=False)
+
+        for issue in squad_payloads["backlog"]:
+            if get_ticket_type(issue) != "sub-task":
+                categorise_ticket(issue, None, squad_id, from_backlog=True)
+
+
+def run_ingest(payloads: dict) -> None:
+    recreate_db()
+    setup_projects_in_db()
+    with engine.begin() as connection:
+        for squad_id, squad_payloads in payloads.items():
+            upsert_sprints(connection, sprint_rows(squad_id, squad_payloads["sprints"]))
+
+    for squad_id, squad_payloads in payloads.items():
+        with Session() as session:
+            sprints = session.execute(select(Sprint).where(Sprint.squad_id == squad_id)).scalars().all()
+
+        with engine.begin() as connection:
+            for sprint in sprints:
+                issues = squad_payloads["sprint_issues"][sprint.jira_id]
+                categorise_and_save_sprint_tickets([issues], sprint, squad_id, connection)
+
+            categorise_and_save_backlog_tickets([squad_payloads["backlog"]], squad_id, connection)
+
+
+def run_benchmarks(payloads: dict) -> dict:
+    results = {}
+    issue_count = sum(
+        len(issues) for squad_payloads in payloads.values() for issues in squad_payloads["sprint_issues"].values()
+    ) + sum(len(squad_payloads["backlog"]) for squad_payloads in payloads.values())
+    sprint_count = sum(len(squad_payloads["sprints"]) for squad_payloads in payloads.values())
+
+    with timed_stage(results, "categorise_ticket", issue_count):
+        run_categorise_ticket(payloads)
+
+    with timed_stage(results, "ingest", issue_count):
+        run_ingest(payloads)
+
+    ticket_tables = {}
+    with timed_stage(results, "load_ticket_table", issue_count):
+        for squad_id in payloads:
+            ticket_tables[squad_id] = load_ticket_table(squad_id)
+
+    sprint_reports = {}
+    with timed_stage(results, "sprint_breakdown", sprint_count):
+        for squad_id in payloads:
+            sprint_reports[squad_id] = sprint_breakdown(ticket_tables[squad_id])
+
+    backlog_reports = {}
+    with timed_stage(results, "backlog_breakdown", len(payloads)):
+        for squad_id in payloads:
+            backlog_reports[squad_id] = backlog_breakdown(ticket_tables[squad_id])
+
+    ticket_reports = {}
+    with timed_stage(results, "ticket_detail", issue_count):
+        for squad_id in payloads:
+            ticket_reports[squad_id] = ticket_detail(ticket_tables[squad_id])
+            # Rows are only built as they're read, so time one full pass
+            deque(ticket_reports[squad_id], maxlen=0)
+
+    report_writer = ReportWriter(tempfile.mkdtemp())
+    with timed_stage(results, "write_reports", sprint_count + len(payloads) + issue_count):
+        for squad_id in payloads:
+            spreadsheet = squad_registry.get_squad(squad_id).spreadsheet
+            report_writer.add_sheet(sprint_reports[squad_id], spreadsheet, Worksheets.sprint)
+            report_writer.add_sheet(backlog_reports[squad_id], spreadsheet, Worksheets.backlog)
+            report_writer.add_sheet(ticket_reports[squad_id], spreadsheet, Worksheets.tickets)
+        report_writer.write()
+
+    return results
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for stage, stage_results in results.items():
+        baseline_results = baseline.get(stage)
+        if not baseline_results:
+            continue
+
+        if stage_results["items_per_second"] < baseline_results["items_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{stage}: {stage_results['items_per_second']:,.1f} items/s, "
+                f"baseline {baseline_results['items_per_second']:,.1f} items/s"
+            )
+        if stage_results["queries"] > baseline_results["queries"]:
+            regressions.append(
+                f"{stage}: {stage_results['queries']} queries, baseline {baseline_results['queries']} queries"
+            )
+
+    return regressions
+
+
+def print_results(results: dict, baseline: dict) -> None:
+    print(f"{'stage':<28}{'seconds':>10}{'items/s':>14}{'baseline':>14}{'queries':>10}{'peak RSS MB':>14}")
+    for stage, stage_results in results.items():
+        baseline_throughput = baseline.get(stage, {}).get("items_per_second")
+        print(
+            f"{stage:<28}{stage_results['seconds']:>10.3f}{stage_results['items_per_second']:>14,.1f}"
+            f"{f'{baseline_throughput:,.1f}' if baseline_throughput is not None else '-':>14}"
+            f"{stage_results['queries']:>10}{stage_results['peak_rss_mb']:>14.1f}"
+        )
+
+
+@click.command()
+@click.option("--squads", default=len(JiraSquadID), show_default=True, help="Number of squads to generate.")
+@click.option("--sprints", default=30, show_default=True, help="Closed sprints per squad.")
+@click.option("--issues-per-sprint", default=40, show_default=True, help="Done issues listed per sprint.")
+@click.option("--backlog-issues", default=300, show_default=True, help="Backlog issues per squad.")
+@click.option("--labels", default=3, show_default=True, help="Most labels on a single issue.")
+@click.option("--components", default=2, show_default=True, help="Most components on a single issue.")
+@click.option("--subtasks", default=3, show_default=True, help="Most subtasks on a single issue.")
+@click.option("--seed", default=0, show_default=True)
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False), help="Results to compare against.")
+@click.option("--save-baseline", type=click.Path(dir_okay=False), help="Write these results out as a new baseline.")
+@click.option("--tolerance", default=0.2, show_default=True, help="Allowed throughput drop before failing.")
+def run_suite(
+    squads: int,
+    sprints: int,
+    issues_per_sprint: int,
+    backlog_issues: int,
+    labels: int,
+    components: int,
+    subtasks: int,
+    seed: int,
+    baseline: str,
+    save_baseline: str,
+    tolerance: float,
+):
+    scale = {
+        "squads": squads,
+        "sprints": sprints,
+        "issues_per_sprint": issues_per_sprint,
+        "backlog_issues": backlog_issues,
+        "labels": labels,
+        "components": components,
+        "subtasks": subtasks,
+        "seed": seed,
+    }
+    print(f"Generating payloads: {scale}")
+    payloads = {
+        squad_id: build_squad_payloads(
+            squad_id, sprints, issues_per_sprint, backlog_issues, labels, components, subtasks, seed=seed
+        )
+        for squad_id in list(JiraSquadID)[:squads]
+    }
+
+    results = run_benchmarks(payloads)
+
+    baseline_results = {}
+    if baseline:
+        with open(baseline) as f:
+            baseline_run = json.load(f)
+        if baseline_run["scale"] != scale:
+            print(f"WARNING: baseline was run at a different scale: {baseline_run['scale']}")
+        baseline_results = baseline_run["results"]
+
+    print_results(results, baseline_results)
+
+    if save_baseline:
+        with open(save_baseline, "w") as f:
+            json.dump({"scale": scale, "results": results}, f, indent=2)
+        print(f"Saved baseline to {save_baseline}")
+
+    regressions = compare_to_baseline(results, baseline_results, tolerance)
+    if regressions:
+        print("Regressions against baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run_suite()
@@ -1,11 +1,107 @@
-from sqlalchemy import create_engine
+import threading
+from functools import wraps
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import declarative_base
 
-engine = create_engine("sqlite://")
+from settings import DB_CACHE_SIZE_KB, DB_MMAP_SIZE, DB_PATH
+
+# Bump whenever a model changes, stores written with an older schema are rebuilt on the next run
+SCHEMA_VERSION = 4
+
+engine = create_engine(f"sqlite:///{DB_PATH}" if DB_PATH else "sqlite://")
 Base = declarative_base()
 
 
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    cursor.close()
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    """Counts the statements run on the engine, from any thread, while the `with` block is open"""
+
+    def __init__(self):
+        self.statements = []
+        self.lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        with self.lock:
+            self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self.record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event.remove(engine, "before_cursor_execute", self.record)
+        return False
+
+
+class query_budget:
+    """Fails a block or function that runs more than `max_statements` statements, so set-based reports stay that way.
+
+    Works as a decorator, `@query_budget(2)`, or in tests as `with query_budget(2): ...`
+    """
+
+    def __init__(self, max_statements: int):
+        self.max_statements = max_statements
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # A fresh counter per call, so nested or concurrent calls don't share one
+            with query_budget(self.max_statements):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def __enter__(self):
+        self.counter = QueryCounter().__enter__()
+        return self.counter
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.counter.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None and self.counter.count > self.max_statements:
+            statements = "\n".join(self.counter.statements)
+            raise QueryBudgetExceeded(
+                f"Ran {self.counter.count} statements, budget is {self.max_statements}:\n{statements}"
+            )
+
+        return False
+
+
+def get_schema_version() -> int:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def create_db():
+    if get_schema_version() != SCHEMA_VERSION:
+        print(f"DB schema is not version {SCHEMA_VERSION}, rebuilding...")
+        recreate_db()
+    else:
+        Base.metadata.create_all(engine)
+
+
 def recreate_db():
     print("Recreating DB...")
+    Base.metadata.drop_all(engine)
     Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
     print("DB clear complete!")
@@ -1,11 +1,10 @@
 import pendulum
 from sqlalchemy import select
-from sqlalchemy.exc import OperationalError
 
-from db.base import recreate_db
+from db.base import create_db, recreate_db
 from db.session import Session
 from jira_enums import Enum
-from models.cache import Cache
+from models.cache import Cache, get_db_date
 
 
 class CacheIDs(str, Enum):
@@ -13,20 +12,17 @@ class CacheIDs(str, Enum):
 
 
 def update_cache(cache_id: CacheIDs):
-    cache = Cache(id=cache_id)
+    cache = Cache(id=cache_id, last_update=get_db_date())
     with Session() as session:
-        session.add(cache)
+        session.merge(cache)
         session.commit()
 
 
-# TODO: update to actual db
 def is_cache_outdated(cache_id: CacheIDs) -> bool:
+    create_db()
     query = select(Cache).where(Cache.id == cache_id)
-    try:
-        with Session() as session:
-            jira_cache = session.execute(query).scalar()
-    except OperationalError:
-        jira_cache = None
+    with Session() as session:
+        jira_cache = session.execute(query).scalar()
 
     if jira_cache:
         refresh_date = pendulum.yesterday()
@@ -35,7 +31,6 @@ def is_cache_outdated(cache_id: CacheIDs) -> bool:
             return False
         else:
             print("Cache has expired, attempting to delete DB")
-            recreate_db()
 
     recreate_db()
     return True
@@ -0,0 +1,75 @@
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from models.sprint import Sprint
+from models.ticket import Project, Ticket, project_ticket
+
+INGEST_BATCH_SIZE = 5000
+
+
+def upsert_rows(connection, model, rows: list, conflict_columns: list) -> None:
+    """executemany INSERT ... ON CONFLICT DO UPDATE, so re-ingesting a row updates it rather than failing the batch"""
+    if not rows:
+        return
+
+    insert_stmt = insert(model)
+    upsert_stmt = insert_stmt.on_conflict_do_update(
+        index_elements=conflict_columns,
+        set_={column: insert_stmt.excluded[column] for column in rows[0] if column not in conflict_columns},
+    )
+    for batch_start in range(0, len(rows), INGEST_BATCH_SIZE):
+        connection.execute(upsert_stmt, rows[batch_start : batch_start + INGEST_BATCH_SIZE])
+
+
+def upsert_tickets(connection, rows: list) -> None:
+    """Upserts categorised ticket rows and replaces their project_ticket memberships from each row's `projects`"""
+    ticket_rows = [{column: value for column, value in row.items() if column != "projects"} for row in rows]
+    upsert_rows(connection, Ticket, ticket_rows, ["squad_id", "jira_id"])
+
+    for batch_start in range(0, len(rows), INGEST_BATCH_SIZE):
+        replace_ticket_projects(connection, rows[batch_start : batch_start + INGEST_BATCH_SIZE])
+
+
+def replace_ticket_projects(connection, rows: list) -> None:
+    if not rows:
+        return
+
+    squad_ids = {row["squad_id"] for row in rows}
+    project_ids = dict(
+        connection.execute(select(Project.name, Project.id).where(Project.jira_squad_id.in_(squad_ids))).all()
+    )
+    if not project_ids:
+        # Squads without projects can't have any memberships to replace
+        return
+
+    ticket_query = select(Ticket.squad_id, Ticket.jira_id, Ticket.id).where(
+        Ticket.squad_id.in_(squad_ids), Ticket.jira_id.in_([row["jira_id"] for row in rows])
+    )
+    ticket_ids = {(squad_id, jira_id): ticket_id for squad_id, jira_id, ticket_id in connection.execute(ticket_query)}
+
+    connection.execute(delete(project_ticket).where(project_ticket.c.ticket_id.in_(ticket_ids.values())))
+    membership_rows = [
+        {"project_id": project_ids[project_name], "ticket_id": ticket_ids[(row["squad_id"], row["jira_id"])]}
+        for row in rows
+        for project_name in row["projects"]
+    ]
+    if membership_rows:
+        connection.execute(insert(project_ticket), membership_rows)
+
+
+def delete_tickets(connection, ticket_filter) -> None:
+    ticket_ids = select(Ticket.id).where(ticket_filter)
+    connection.execute(delete(project_ticket).where(project_ticket.c.ticket_id.in_(ticket_ids)))
+    connection.execute(delete(Ticket).where(ticket_filter))
+
+
+def upsert_sprints(connection, rows: list) -> None:
+    upsert_rows(connection, Sprint, rows, ["squad_id", "jira_id"])
+
+
+def update_sprint_totals(connection, sprint_id: int, tickets_carried_over: int, defect_total: int) -> None:
+    connection.execute(
+        update(Sprint)
+        .where(Sprint.id == sprint_id)
+        .values(tickets_carried_over=tickets_carried_over, defect_total=defect_total)
+    )
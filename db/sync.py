@@ -0,0 +1,25 @@
+from typing import Union
+
+import pendulum
+from sqlalchemy import select
+
+from db.session import Session
+from jira.references import JiraSquadID
+from models.sync import SyncState
+
+
+def get_last_sync(squad_id: JiraSquadID) -> Union[None, pendulum.DateTime]:
+    query = select(SyncState).where(SyncState.squad_id == squad_id)
+    with Session() as session:
+        sync_state = session.execute(query).scalar()
+
+    if sync_state:
+        return pendulum.parse(sync_state.last_sync)
+
+    return None
+
+
+def update_last_sync(squad_id: JiraSquadID, synced_at: pendulum.DateTime) -> None:
+    with Session() as session:
+        session.merge(SyncState(squad_id=squad_id, last_sync=synced_at.to_iso8601_string()))
+        session.commit()
@@ -1,29 +1,58 @@
 import os
+from typing import Iterable, Iterator
 
-from openpyxl.reader.excel import load_workbook
 from openpyxl.workbook import Workbook
 
+from exporters import split_header
 from jira_enums import SPREADSHEET_BASE_DIR, Worksheets
-
-
-def write_data_to_spreadsheet(squad_info: list, filename: str, worksheet: Worksheets):
-    if not os.path.isdir(SPREADSHEET_BASE_DIR):
-        os.mkdir(SPREADSHEET_BASE_DIR)
-
-    file_path = os.path.join(SPREADSHEET_BASE_DIR, filename)
-    try:
-        wb = load_workbook(filename=file_path)
-    except FileNotFoundError:
-        wb = Workbook()
-        wb.remove(wb["Sheet"])
-
-    ws = wb.create_sheet(title=worksheet.value)
-
-    data = [list(squad_info[0].keys())]
-    for squad_dict in squad_info:
-        data.append(list(squad_dict.values()))
-
-    for row in data:
-        ws.append(row)
-
-    wb.save(file_path)
+from manifest import is_unchanged, rows_digest
+
+
+class ReportWriter:
+    """Collects every sheet of a workbook, then streams them out with one write-only save per workbook.
+
+    Workbooks whose sheets match the digests in `manifest` are left untouched, `manifest_updates` holds the digests
+    of every workbook this writer has handled.
+    """
+
+    def __init__(self, base_dir: str = SPREADSHEET_BASE_DIR, manifest: dict = None):
+        self.base_dir = base_dir
+        self.manifest = manifest or {}
+        self.manifest_updates = {}
+        # filename -> {worksheet: rows}, in the order sheets were added
+        self.workbooks = {}
+
+    def add_sheet(self, squad_info: Iterable[dict], filename: str, worksheet: Worksheets) -> None:
+        # Digested before it's written, so the rows are read twice. A one-shot iterator is read into a list, a
+        # re-iterable row source like analytics.TicketDetailRows is left to build its rows again on each pass.
+        if isinstance(squad_info, Iterator):
+            squad_info = list(squad_info)
+        self.workbooks.setdefault(filename, {})[worksheet] = squad_info
+
+    def write_workbook(self, filename: str) -> bool:
+        """Writes the workbook unless its sheets are unchanged since the last write, returns whether it wrote"""
+        sheets = self.workbooks.pop(filename)
+        file_path = os.path.join(self.base_dir, filename)
+        sheet_digests = {worksheet.value: rows_digest(squad_info) for worksheet, squad_info in sheets.items()}
+        self.manifest_updates[file_path] = sheet_digests
+        if is_unchanged(self.manifest, file_path, sheet_digests):
+            return False
+
+        os.makedirs(self.base_dir, exist_ok=True)
+        wb = Workbook(write_only=True)
+        for worksheet, squad_info in sheets.items():
+            ws = wb.create_sheet(title=worksheet.value)
+            header, rows = split_header(squad_info)
+            if not header:
+                continue
+
+            ws.append(header)
+            for squad_dict in rows:
+                ws.append(list(squad_dict.values()))
+
+        wb.save(file_path)
+        return True
+
+    def write(self) -> None:
+        for filename in list(self.workbooks):
+            self.write_workbook(filename)
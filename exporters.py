@@ -0,0 +1,127 @@
+"""Streaming file exporters for report rows, alongside the Excel workbooks in excel.py.
+
+Each exporter takes rows as an iterable of dicts sharing the first row's keys, and writes them out as it goes. Parquet
+reads them twice, the first pass settles each column's type.
+"""
+
+import csv
+import json
+import os
+from enum import Enum
+from itertools import chain, islice
+from typing import Iterable, Iterator, Tuple, Union
+
+PARQUET_BATCH_SIZE = 10000
+
+
+def split_header(rows: Iterable[dict]) -> Tuple[Union[None, list], Iterator[dict]]:
+    """Peeks the column names off the first row, returning them with an iterator over every row"""
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if first_row is None:
+        return None, iter(())
+
+    return list(first_row), chain([first_row], rows)
+
+
+def import_pyarrow() -> tuple:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as err:
+        raise RuntimeError("Parquet exports need pyarrow, install it with `pipenv run pip install pyarrow`") from err
+
+    return pa, pq
+
+
+def iter_batches(rows: Iterable[dict], batch_size: int) -> Iterator[list]:
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def plain_value(value):
+    # csv writes str() of a value, which for an Enum member is its name rather than the value every other format gets
+    return value.value if isinstance(value, Enum) else value
+
+
+class Exporter:
+    extension = None
+
+    def check_available(self) -> None:
+        """Raises RuntimeError when an optional dependency the format needs isn't installed"""
+
+    def export(self, rows: Iterable[dict], path: str) -> int:
+        raise NotImplementedError
+
+
+class CsvExporter(Exporter):
+    extension = "csv"
+
+    def export(self, rows: Iterable[dict], path: str) -> int:
+        header, rows = split_header(rows)
+        row_count = 0
+        with open(path, "w", newline="") as f:
+            if header:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                for row in rows:
+                    writer.writerow([plain_value(value) for value in row.values()])
+                    row_count += 1
+
+        return row_count
+
+
+class JsonLinesExporter(Exporter):
+    extension = "jsonl"
+
+    def export(self, rows: Iterable[dict], path: str) -> int:
+        row_count = 0
+        with open(path, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str))
+                f.write("\n")
+                row_count += 1
+
+        return row_count
+
+
+class ParquetExporter(Exporter):
+    extension = "parquet"
+
+    def check_available(self) -> None:
+        import_pyarrow()
+
+    def export(self, rows: Iterable[dict], path: str) -> int:
+        pa, pq = import_pyarrow()
+        if isinstance(rows, Iterator):
+            # The schema is worked out over every row before any are written, so a one-shot iterator is read in
+            rows = list(rows)
+
+        # Each batch's inferred types are widened to fit every other batch, a column that is all None in one batch or
+        # whole numbers in another still takes the type of its real values rather than being cast to the first one's
+        batch_schemas = [pa.Table.from_pylist(batch).schema for batch in iter_batches(rows, PARQUET_BATCH_SIZE)]
+        if not batch_schemas:
+            pq.write_table(pa.table({}), path)
+            return 0
+
+        schema = pa.unify_schemas(batch_schemas, promote_options="permissive")
+        row_count = 0
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in iter_batches(rows, PARQUET_BATCH_SIZE):
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                row_count += len(batch)
+
+        return row_count
+
+
+EXPORTERS = {exporter.extension: exporter for exporter in [CsvExporter, JsonLinesExporter, ParquetExporter]}
+
+
+def export_rows(rows: Iterable[dict], base_path: str, export_format: str) -> str:
+    """Writes rows to `base_path` plus the format's extension, returning the file's path"""
+    exporter = EXPORTERS[export_format]()
+    os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+    path = f"{base_path}.{exporter.extension}"
+    exporter.export(rows, path)
+    return path
@@ -0,0 +1,174 @@
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Union
+
+from sqlalchemy import event
+
+from db.base import engine
+
+# Sprint, board and issue ids would give every sprint its own endpoint
+PATH_ID_PATTERN = re.compile(r"/(board|sprint|issue)/\d+")
+PATH_ID_REPLACEMENT = r"/\1/{id}"
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+LATENCY_PERCENTILES = [50, 90, 99]
+
+
+def percentile(sorted_values: list, percent: int) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+
+    return sorted_values[max(math.ceil(percent / 100 * len(sorted_values)) - 1, 0)]
+
+
+class RunMetrics:
+    """Timings, Jira request stats and SQL stats for one metrics run.
+
+    Spans are keyed by squad and phase and accumulate across calls. SQL statements are charged to the innermost
+    open span, whichever thread runs them, since each squad's phases run one after another.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.perf_counter()
+        self.spans = {}
+        self.open_spans = []
+        self.http = {}
+
+    def span_stats(self, key: tuple) -> dict:
+        return self.spans.setdefault(
+            key, {"seconds": 0.0, "calls": 0, "sql_statements": 0, "sql_seconds": 0.0, "rows_written": 0}
+        )
+
+    @contextmanager
+    def span(self, squad: Union[None, int], phase: str):
+        key = (squad, phase)
+        with self.lock:
+            self.open_spans.append(key)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.open_spans.remove(key)
+                stats = self.span_stats(key)
+                stats["seconds"] += elapsed
+                stats["calls"] += 1
+
+    def take_spans(self) -> dict:
+        """Returns the span stats recorded so far and clears them, for handing a worker process's spans back"""
+        with self.lock:
+            spans, self.spans = self.spans, {}
+
+        return spans
+
+    def merge_spans(self, spans: dict) -> None:
+        with self.lock:
+            for key, span_stats in spans.items():
+                stats = self.span_stats(key)
+                for name, value in span_stats.items():
+                    stats[name] += value
+
+    def record_sql(self, seconds: float, rows_written: int) -> None:
+        with self.lock:
+            stats = self.span_stats(self.open_spans[-1] if self.open_spans else (None, "other"))
+            stats["sql_statements"] += 1
+            stats["sql_seconds"] += seconds
+            stats["rows_written"] += rows_written
+
+    def record_http(self, method: str, path: str, status_code: int, response_bytes: int, seconds: float) -> None:
+        endpoint = f"{method} {PATH_ID_PATTERN.sub(PATH_ID_REPLACEMENT, path.split('?')[0])}"
+        with self.lock:
+            stats = self.http.setdefault(endpoint, {"requests": 0, "bytes": 0, "latencies": [], "status_codes": {}})
+            stats["requests"] += 1
+            stats["bytes"] += response_bytes
+            stats["latencies"].append(seconds)
+            stats["status_codes"][str(status_code)] = stats["status_codes"].get(str(status_code), 0) + 1
+
+    def summary(self) -> dict:
+        with self.lock:
+            spans = [
+                {
+                    # Squad ids are JiraSquadID members everywhere except callers outside the run, e.g. benchmarks
+                    "squad": getattr(squad, "name", squad),
+                    "phase": phase,
+                    **{name: round(value, 4) for name, value in stats.items()},
+                }
+                for (squad, phase), stats in self.spans.items()
+            ]
+            http = []
+            for endpoint, stats in sorted(self.http.items()):
+                latencies = sorted(stats["latencies"])
+                http.append(
+                    {
+                        "endpoint": endpoint,
+                        "requests": stats["requests"],
+                        "bytes": stats["bytes"],
+                        "status_codes": dict(stats["status_codes"]),
+                        "latency_ms": {
+                            **{
+                                f"p{percent}": round(percentile(latencies, percent) * 1000, 1)
+                                for percent in LATENCY_PERCENTILES
+                            },
+                            "max": round(latencies[-1] * 1000, 1),
+                        },
+                    }
+                )
+
+        return {"duration_seconds": round(time.perf_counter() - self.started_at, 4), "spans": spans, "http": http}
+
+    def write_metrics_file(self, path: str) -> None:
+        """Writes the summary in the Prometheus text format, swapped in whole so a scraper never reads half a file"""
+        summary = self.summary()
+        lines = [f"jira_metrics_run_seconds {summary['duration_seconds']}"]
+        for span in summary["spans"]:
+            span_labels = f'squad="{span["squad"] or ""}",phase="{span["phase"]}"'
+            lines.extend(
+                [
+                    f"jira_metrics_phase_seconds{{{span_labels}}} {span['seconds']}",
+                    f"jira_metrics_sql_statements_total{{{span_labels}}} {span['sql_statements']}",
+                    f"jira_metrics_sql_seconds_total{{{span_labels}}} {span['sql_seconds']}",
+                    f"jira_metrics_rows_written_total{{{span_labels}}} {span['rows_written']}",
+                ]
+            )
+        for endpoint in summary["http"]:
+            endpoint_labels = f'endpoint="{endpoint["endpoint"]}"'
+            lines.extend(
+                [
+                    f"jira_metrics_http_requests_total{{{endpoint_labels}}} {endpoint['requests']}",
+                    f"jira_metrics_http_response_bytes_total{{{endpoint_labels}}} {endpoint['bytes']}",
+                ]
+            )
+            for percent in LATENCY_PERCENTILES:
+                latency = endpoint["latency_ms"][f"p{percent}"] / 1000
+                lines.append(
+                    f'jira_metrics_http_latency_seconds{{{endpoint_labels},quantile="{percent / 100}"}} {latency}'
+                )
+
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(temp_path, path)
+
+
+run_metrics = RunMetrics()
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def start_sql_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def record_sql(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["statement_started_at"].pop()
+    rows_written = 0
+    if statement.lstrip().upper().startswith(WRITE_STATEMENTS) and cursor.rowcount > 0:
+        rows_written = cursor.rowcount
+
+    run_metrics.record_sql(elapsed, rows_written)
@@ -0,0 +1,170 @@
+import atexit
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Iterator, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import run_metrics
+from jira.recorder import FixtureStore
+from jira.scheduler import RequestScheduler, jira_scheduler
+from settings import (
+    JIRA_API_SECRET,
+    JIRA_BASE_URL,
+    JIRA_EMAIL,
+    JIRA_MAX_IN_FLIGHT_PAGES,
+    JIRA_PAGE_CONCURRENCY,
+    JIRA_POOL_SIZE,
+    JIRA_RECORD_DIR,
+    JIRA_REQUEST_TIMEOUT,
+)
+
+DEFAULT_PAGE_SIZE = 50
+
+# Largest maxResults each endpoint accepts, Jira caps anything above this and reports the cap back in maxResults
+SEARCH_PAGE_SIZE = 100
+AGILE_ISSUE_PAGE_SIZE = 100
+AGILE_SPRINT_PAGE_SIZE = 50
+
+
+class JiraClient:
+    """Thin wrapper around a pooled `requests.Session` so every fetcher shares keep-alive connections."""
+
+    def __init__(
+        self,
+        base_url: str,
+        auth: tuple,
+        scheduler: RequestScheduler,
+        pool_size: int = 10,
+        page_concurrency: int = 4,
+        max_in_flight_pages: int = 8,
+        timeout: float = 30,
+        recorder: Union[None, FixtureStore] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.max_in_flight_pages = max(max_in_flight_pages, 1)
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self.page_executor = ThreadPoolExecutor(max_workers=max(page_concurrency, 1))
+        self.session = requests.Session()
+        self.session.auth = auth
+        self.session.headers.update(
+            {
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate",
+                "Connection": "keep-alive",
+            }
+        )
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+
+        def send_request() -> requests.Response:
+            start = time.perf_counter()
+            resp = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            run_metrics.record_http(method, path, resp.status_code, len(resp.content), time.perf_counter() - start)
+            return resp
+
+        return self.scheduler.send(send_request)
+
+    def get(self, path: str, params: dict = None) -> requests.Response:
+        return self.request("GET", path, params=params)
+
+    def post(self, path: str, json: dict = None) -> requests.Response:
+        return self.request("POST", path, json=json)
+
+    def paginate(
+        self,
+        method: str,
+        path: str,
+        results_key: str,
+        params: dict = None,
+        json: dict = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> list:
+        pages = self.iter_pages(method, path, results_key, params=params, json=json, page_size=page_size)
+        return [result for page in pages for result in page]
+
+    def iter_pages(
+        self,
+        method: str,
+        path: str,
+        results_key: str,
+        params: dict = None,
+        json: dict = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[list]:
+        """Yields each page of results in order, with at most `max_in_flight_pages` requested ahead of the consumer"""
+        first_page = self.fetch_page(method, path, 0, page_size, params=params, json=json)
+        fetched = len(first_page[results_key])
+        page_size = first_page.get("maxResults") or page_size
+
+        total = first_page.get("total")
+        if total is None:
+            # Endpoints such as the board sprint list only report isLast, so they have to be walked in order
+            yield first_page[results_key]
+            page = first_page
+            while not page.get("isLast", len(page[results_key]) < page_size):
+                page = self.fetch_page(method, path, fetched, page_size, params=params, json=json)
+                if not page[results_key]:
+                    break
+
+                fetched += len(page[results_key])
+                yield page[results_key]
+
+            return
+
+        def submit_page(start_at: int) -> Future:
+            return self.page_executor.submit(
+                self.fetch_page, method, path, start_at, page_size, params=params, json=json
+            )
+
+        offsets = iter(range(fetched, total, page_size) if fetched else [])
+        in_flight = deque(submit_page(start_at) for start_at in islice(offsets, self.max_in_flight_pages))
+        yield first_page[results_key]
+        del first_page
+
+        while in_flight:
+            page = in_flight.popleft().result()
+            next_start_at = next(offsets, None)
+            if next_start_at is not None:
+                in_flight.append(submit_page(next_start_at))
+
+            yield page[results_key]
+
+    def fetch_page(
+        self, method: str, path: str, start_at: int, page_size: int, params: dict = None, json: dict = None
+    ) -> dict:
+        page = {"startAt": start_at, "maxResults": page_size}
+        if method == "POST":
+            resp = self.post(path, json={**(json or {}), **page})
+        else:
+            resp = self.get(path, params={**(params or {}), **page})
+
+        response_body = resp.json()
+        if self.recorder:
+            self.recorder.record(method, path, params, json, response_body)
+
+        return response_body
+
+
+jira_client = JiraClient(
+    JIRA_BASE_URL,
+    (JIRA_EMAIL, JIRA_API_SECRET),
+    jira_scheduler,
+    pool_size=JIRA_POOL_SIZE,
+    page_concurrency=JIRA_PAGE_CONCURRENCY,
+    max_in_flight_pages=JIRA_MAX_IN_FLIGHT_PAGES,
+    timeout=JIRA_REQUEST_TIMEOUT,
+    recorder=FixtureStore(JIRA_RECORD_DIR) if JIRA_RECORD_DIR else None,
+)
+if jira_client.recorder:
+    atexit.register(jira_client.recorder.save)
@@ -0,0 +1,58 @@
+import threading
+from queue import Empty, Full, Queue
+from typing import Iterable, Iterator
+
+from settings import JIRA_MAX_IN_FLIGHT_PAGES
+
+_END_OF_STREAM = object()
+
+
+def prefetch(items: Iterable, max_buffered: int = JIRA_MAX_IN_FLIGHT_PAGES) -> Iterator:
+    """Drives `items` on a background thread so fetching overlaps with whatever the consumer does with each item.
+
+    At most `max_buffered` items wait in the queue, once it is full the producer blocks until the consumer catches up.
+    Errors raised while producing are re-raised to the consumer.
+    """
+    buffer = Queue(maxsize=max(max_buffered, 1))
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except Exception as ex:
+            put((_END_OF_STREAM, ex))
+            return
+
+        put((_END_OF_STREAM, None))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            try:
+                item, error = buffer.get(timeout=0.1)
+            except Empty:
+                if not producer.is_alive() and buffer.empty():
+                    return
+                continue
+
+            if error:
+                raise error
+            if item is _END_OF_STREAM:
+                return
+
+            yield item
+    finally:
+        stopped.set()
@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from typing import Union
+
+PAGING_KEYS = ["startAt", "maxResults"]
+
+
+def collection_key(method: str, path: str, params: Union[None, dict], body: Union[None, dict]) -> str:
+    """Identifies a paginated collection, i.e. the request with its paging keys stripped out"""
+    request = {
+        "method": method.upper(),
+        "path": path,
+        "params": {key: str(value) for key, value in (params or {}).items() if key not in PAGING_KEYS},
+        "body": {key: value for key, value in (body or {}).items() if key not in PAGING_KEYS},
+    }
+    return hashlib.sha1(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+
+def get_results_key(response_body: dict) -> Union[None, str]:
+    for key in ["issues", "values"]:
+        if isinstance(response_body.get(key), list):
+            return key
+
+    return None
+
+
+class FixtureStore:
+    """Gzipped JSON fixtures of recorded Jira responses, one file per paginated collection.
+
+    Pages are merged into a single result list per collection, so a replay can re-slice them at any page size.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.collections = {}
+        self.lock = threading.Lock()
+
+    def fixture_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json.gz")
+
+    def record(self, method: str, path: str, params: dict, body: dict, response_body: dict) -> None:
+        results_key = get_results_key(response_body)
+        if not results_key:
+            return
+
+        key = collection_key(method, path, params, body)
+        start_at = response_body.get("startAt", 0)
+        results = response_body[results_key]
+        with self.lock:
+            collection = self.collections.setdefault(
+                key,
+                {
+                    "method": method.upper(),
+                    "path": path,
+                    "results_key": results_key,
+                    "total": response_body.get("total"),
+                    "results": [],
+                },
+            )
+            recorded_results = collection["results"]
+            if len(recorded_results) < start_at + len(results):
+                recorded_results.extend([None] * (start_at + len(results) - len(recorded_results)))
+            recorded_results[start_at : start_at + len(results)] = results
+
+    def save(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with self.lock:
+            for key, collection in self.collections.items():
+                with gzip.open(self.fixture_path(key), "wt") as f:
+                    json.dump(collection, f)
+
+        print(f"Recorded {len(self.collections)} Jira collections to {self.directory}")
+
+    def load(self, key: str) -> Union[None, dict]:
+        with self.lock:
+            if key in self.collections:
+                return self.collections[key]
+
+        try:
+            with gzip.open(self.fixture_path(key), "rt") as f:
+                collection = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        with self.lock:
+            self.collections[key] = collection
+
+        return collection
@@ -1,39 +1,36 @@
-import pendulum
+from enum import IntFlag
 
+from jira.registry import squad_registry
 from jira_enums import Enum
 
+# Boards come from the squad config, so onboarding one is a config change
+JiraSquadID = Enum("JiraSquadID", [(squad.name, squad.id) for squad in squad_registry.squads], type=int)
 
-class JiraSquadID(int, Enum):
-    BANK = 126
-    BPL = 168
-    MERCHANT = 172
-    MOBILE = 201
-
-
-SQUAD_IDENTIFIERS = {
-    JiraSquadID.BANK: [
-        {
-            "name": "API 2.0 Banking Release",
-            "query_field": "components",
-            "query_value": "API v2.0 Banking Release",
-            "start_sprint": pendulum.parse("2001-01-20").to_date_string(),
-            "project_capacity": 0.3,
-        },
-        {
-            "name": "Data Warehouse",
-            "query_field": "components",
-            "query_value": "Data Warehouse",
-            "start_sprint": pendulum.parse("2001-01-20").to_date_string(),
-            "project_capacity": 0.3,
-        },
-    ],
-    JiraSquadID.BPL: [],
-    JiraSquadID.MERCHANT: [],
-    JiraSquadID.MOBILE: [],
+TECHNICAL_TICKET_LABEL_LIST = list(squad_registry.technical_labels)
+
+
+class TechLabel(IntFlag):
+    SECURITY = 1
+    DEVOPS = 2
+    MISC_TECH = 4
+
+
+class ProductLabel(IntFlag):
+    BAU_PRODUCT = 1
+    PROJECT = 2
+
+
+# Lowercase label -> tech category. A MISC_TECH label only counts when no earlier label gave the ticket a category.
+TECHNICAL_LABEL_CATEGORIES = {
+    label: TechLabel[category.upper()] for label, category in squad_registry.technical_labels.items()
 }
 
 
-TECHNICAL_TICKET_LABEL_LIST = ["technical", "security", "secops", "devops", "msm"]
+class IngestMode(str, Enum):
+    # One agile issue listing per sprint, carried over issues are downloaded once for every sprint they touched
+    PER_SPRINT = "per-sprint"
+    # One JQL search over all of the squad's sprints, each issue is downloaded once
+    SQUAD_WIDE = "squad-wide"
 
 
 class SprintStatus(str, Enum):
@@ -42,7 +39,20 @@ class SprintStatus(str, Enum):
     ACTIVE = "active"
 
 
-# CHECK ME
-STORY_POINT_JIRA_FIELD = "customfield_10117"
-SPRINT_JIRA_FIELD = "customfield_10115"
-LOY_STORY_POINT_JIRA_FIELD = "customfield_10347"
+STORY_POINT_JIRA_FIELD = squad_registry.custom_fields["story_points"]
+SPRINT_JIRA_FIELD = squad_registry.custom_fields["sprint"]
+LOY_STORY_POINT_JIRA_FIELD = squad_registry.custom_fields["loy_story_points"]
+
+# Fields categorise_ticket reads on every issue, squads add their refinement field and any `jira_fields` in config
+TICKET_JIRA_FIELDS = [
+    "issuetype",
+    "summary",
+    "labels",
+    "components",
+    "created",
+    "resolutiondate",
+    "status",
+    "subtasks",
+    STORY_POINT_JIRA_FIELD,
+    SPRINT_JIRA_FIELD,
+]
@@ -0,0 +1,123 @@
+import json
+from types import MappingProxyType
+from typing import NamedTuple, Union
+
+from settings import SQUAD_CONFIG_PATH
+
+TECH_CATEGORIES = ["security", "devops", "misc_tech"]
+
+
+class ConfigError(Exception):
+    pass
+
+
+class ProjectConfig(NamedTuple):
+    name: str
+    # Lowercase component names that put a ticket in this project
+    components: frozenset
+    start_date: str
+    initial_story_point_estimate: int
+    sprint_commitment_groups: tuple
+
+
+class SquadConfig(NamedTuple):
+    id: int
+    name: str
+    spreadsheet: str
+    # Squads mark refined tickets either with a custom field set to `refined_value`, or by keeping unrefined
+    # tickets in a "ready for refinement" sprint. Values are lowercase.
+    refined_field: Union[None, str]
+    refined_value: Union[None, str]
+    unrefined_sprint: Union[None, str]
+    projects: tuple
+    # Every field categorisation reads for this squad's issues, on top of the shared ticket fields
+    jira_fields: tuple
+    # Lowercase component name -> names of the projects it belongs to, in config order
+    component_projects: MappingProxyType
+
+
+class SquadRegistry(NamedTuple):
+    squads: tuple
+    squads_by_id: MappingProxyType
+    custom_fields: MappingProxyType
+    # Lowercase label -> tech category
+    technical_labels: MappingProxyType
+
+    def get_squad(self, squad_id: int) -> SquadConfig:
+        return self.squads_by_id[squad_id]
+
+
+def parse_project(project: dict) -> ProjectConfig:
+    unknown_rules = set(project["match"]) - {"components"}
+    if unknown_rules:
+        raise ConfigError(f"Project {project['name']} has unsupported match rules: {sorted(unknown_rules)}")
+
+    return ProjectConfig(
+        name=project["name"],
+        components=frozenset(component.lower() for component in project["match"]["components"]),
+        start_date=project.get("start_date"),
+        initial_story_point_estimate=project.get("initial_story_point_estimate"),
+        sprint_commitment_groups=tuple(frozenset(group) for group in project.get("sprint_commitment_groups", [])),
+    )
+
+
+def parse_squad(board: dict) -> SquadConfig:
+    refinement = board["refinement"]
+    refined_field = refinement.get("field")
+    unrefined_sprint = refinement.get("unrefined_sprint")
+    if bool(refined_field) == bool(unrefined_sprint):
+        raise ConfigError(f"Board {board['name']} needs exactly one of refinement.field or refinement.unrefined_sprint")
+
+    projects = tuple(parse_project(project) for project in board["projects"])
+    project_names = [project.name for project in projects]
+    if len(set(project_names)) != len(project_names):
+        raise ConfigError(f"Board {board['name']} has duplicate project names")
+
+    component_projects = {}
+    for project in projects:
+        for component in project.components:
+            component_projects.setdefault(component, []).append(project.name)
+
+    return SquadConfig(
+        id=board["id"],
+        name=board["name"],
+        spreadsheet=board["spreadsheet"],
+        refined_field=refined_field,
+        refined_value=refinement.get("refined_value", "yes").lower() if refined_field else None,
+        unrefined_sprint=unrefined_sprint.lower() if unrefined_sprint else None,
+        projects=projects,
+        jira_fields=tuple(dict.fromkeys([refined_field or "sprint", *board.get("jira_fields", [])])),
+        component_projects=MappingProxyType(
+            {component: tuple(names) for component, names in component_projects.items()}
+        ),
+    )
+
+
+def load_registry(config_path: str) -> SquadRegistry:
+    with open(config_path) as f:
+        config = json.load(f)
+
+    squads = tuple(parse_squad(board) for board in config["boards"])
+    squads_by_id = {squad.id: squad for squad in squads}
+    if len(squads_by_id) != len(squads) or len({squad.name for squad in squads}) != len(squads):
+        raise ConfigError(f"Duplicate board id or name in {config_path}")
+
+    # Boards sharing a spreadsheet would overwrite each other's workbook, compared as case-insensitive filesystems do
+    spreadsheets = [squad.spreadsheet.lower() for squad in squads]
+    if len(set(spreadsheets)) != len(spreadsheets):
+        raise ConfigError(f"Duplicate board spreadsheet in {config_path}")
+
+    technical_labels = {label.lower(): category for label, category in config["technical_labels"].items()}
+    unknown_categories = set(technical_labels.values()) - set(TECH_CATEGORIES)
+    if unknown_categories:
+        raise ConfigError(f"Unknown technical label categories: {sorted(unknown_categories)}")
+
+    return SquadRegistry(
+        squads=squads,
+        squads_by_id=MappingProxyType(squads_by_id),
+        custom_fields=MappingProxyType(dict(config["custom_fields"])),
+        technical_labels=MappingProxyType(technical_labels),
+    )
+
+
+squad_registry = load_registry(SQUAD_CONFIG_PATH)
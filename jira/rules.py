@@ -0,0 +1,150 @@
+import re
+from functools import lru_cache
+from typing import Union
+
+import pendulum
+
+from jira.references import (
+    STORY_POINT_JIRA_FIELD,
+    TECHNICAL_LABEL_CATEGORIES,
+    JiraSquadID,
+    ProductLabel,
+    TechLabel,
+)
+from jira.registry import squad_registry
+from models.sprint import Sprint
+
+TICKET_TYPES = {"story": "user_story", "bug": "bug"}
+# Jira's own timestamp format, the stored string is just its local date and time
+JIRA_DATETIME_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}")
+
+
+def to_datetime_string(jira_datetime: str) -> str:
+    """Same result as `pendulum.parse(jira_datetime).to_datetime_string()`, without parsing Jira's usual format"""
+    if JIRA_DATETIME_PATTERN.match(jira_datetime):
+        return f"{jira_datetime[:10]} {jira_datetime[11:19]}"
+
+    return pendulum.parse(jira_datetime).to_datetime_string()
+
+
+class SquadRules:
+    """A squad's project, label and refinement rules from the squad registry, so categorising a ticket costs a few
+    dict hits however many projects the squad has"""
+
+    def __init__(self, squad_id: JiraSquadID):
+        self.squad_id = squad_id
+        squad = squad_registry.get_squad(squad_id)
+        self.project_order = {project.name: position for position, project in enumerate(squad.projects)}
+        self.component_projects = squad.component_projects
+        self.refined_field = squad.refined_field
+        self.refined_value = squad.refined_value
+        self.unrefined_sprint = squad.unrefined_sprint
+
+        # Raw label -> category, Jira labels repeat a lot so each spelling is only lowercased once
+        self.label_categories = {}
+
+    def get_tech_labels(self, labels: list) -> int:
+        tech_labels = 0
+        for label in labels:
+            category = self.label_categories.get(label)
+            if category is None:
+                category = self.label_categories[label] = TECHNICAL_LABEL_CATEGORIES.get(label.lower(), 0)
+            if category == TechLabel.MISC_TECH:
+                if not tech_labels:
+                    tech_labels = TechLabel.MISC_TECH
+            else:
+                tech_labels |= category
+
+        return int(tech_labels)
+
+    def get_projects(self, components: Union[None, list]) -> list:
+        if not components or not self.component_projects:
+            return []
+
+        projects = set()
+        for component in components:
+            projects.update(self.component_projects.get(component["name"].lower(), ()))
+
+        return sorted(projects, key=self.project_order.get)
+
+    def is_ticket_refined(self, ticket_info: dict) -> bool:
+        if self.refined_field:
+            # For some reason the Bank "is refined" field returns a list
+            refined_list = ticket_info["fields"][self.refined_field] or []
+            if not isinstance(refined_list, list):
+                raise ValueError(f"Refined custom field {self.refined_field} is no longer a list, please update!")
+
+            return any(refined_label["value"].lower() == self.refined_value for refined_label in refined_list)
+
+        ticket_sprints = ticket_info["fields"]["sprint"] or []
+        if not ticket_sprints:
+            return False
+
+        return all(sprint["name"].lower() != self.unrefined_sprint for sprint in ticket_sprints)
+
+    def categorise(self, ticket_info: dict, sprint: Union[None, Sprint], from_backlog: bool = False) -> dict:
+        """Returns the ticket as a plain `ticket` row, ready for a bulk upsert"""
+        fields = ticket_info["fields"]
+        jira_ticket_type = fields["issuetype"]["name"].lower()
+        if "investig" in fields["summary"].lower():
+            ticket_type = "investigation"
+        else:
+            ticket_type = TICKET_TYPES.get(jira_ticket_type)
+            if not ticket_type:
+                ticket_type = jira_ticket_type
+                print(
+                    f"ALERT!!!! UNEXPECTED TICKET TYPE: {ticket_type}. Ticket key: {ticket_info['key']}, "
+                    f"from_backlog: {from_backlog}, skipping..."
+                )
+
+        tech_labels = self.get_tech_labels(fields["labels"])
+        projects = self.get_projects(fields["components"])
+        if projects:
+            product_labels = ProductLabel.PROJECT
+        elif not tech_labels:
+            product_labels = ProductLabel.BAU_PRODUCT
+        else:
+            product_labels = 0
+
+        if from_backlog:
+            backlog = "True"
+            ticket_resolution_date = None
+            refined = str(self.is_ticket_refined(ticket_info))
+        else:
+            backlog = "False"
+            refined = "True"
+            resolution_date = fields["resolutiondate"]
+            if resolution_date:
+                ticket_resolution_date = to_datetime_string(resolution_date)
+            else:
+                ticket_resolution_date = None
+                print(
+                    f"I'm not expecting tickets with no resolution date on completed sprints! "
+                    f"Carried over tickets should already be filtered! Check ticket: {ticket_info['key']}"
+                )
+
+        return {
+            "squad_id": self.squad_id,
+            "jira_id": int(ticket_info["id"]),
+            "jira_ref": ticket_info["key"],
+            "ticket_type": ticket_type,
+            "ticket_created_date": to_datetime_string(fields["created"]),
+            "story_points": fields.get(STORY_POINT_JIRA_FIELD),
+            "ticket_specific_completed_date": ticket_resolution_date,
+            "ticket_sprint_completed_date": sprint.end_date if sprint else None,
+            "sprint_id": sprint.id if sprint else None,
+            "tech_labels": tech_labels,
+            "product_labels": int(product_labels),
+            # Not a ticket column, written to project_ticket by upsert_tickets
+            "projects": projects,
+            "refined": refined,
+            "backlog": backlog,
+        }
+
+    def categorise_page(self, tickets: list, sprint: Union[None, Sprint], from_backlog: bool = False) -> list:
+        return [self.categorise(ticket_info, sprint, from_backlog) for ticket_info in tickets]
+
+
+@lru_cache(maxsize=None)
+def get_squad_rules(squad_id: JiraSquadID) -> SquadRules:
+    return SquadRules(squad_id)
@@ -0,0 +1,118 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Union
+
+import pendulum
+import requests
+
+from settings import JIRA_MAX_RETRIES, JIRA_REQUEST_BURST, JIRA_REQUESTS_PER_SECOND
+
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+
+def parse_retry_after(retry_after: Union[None, str]) -> Union[None, float]:
+    if not retry_after:
+        return None
+
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_date = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+
+    return max(retry_date.timestamp() - pendulum.now().timestamp(), 0.0)
+
+
+class RequestScheduler:
+    """Token bucket shared by every Jira request, with backoff on throttled and failed responses.
+
+    A 429 pauses the whole bucket rather than just the thread that saw it, so every squad's fetches back off
+    together instead of each hammering the quota until it is throttled too.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+    ):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                    self.updated_at = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+
+                    wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self.lock:
+            paused_until = time.monotonic() + seconds
+            if paused_until > self.paused_until:
+                self.paused_until = paused_until
+                self.tokens = 0.0
+                self.updated_at = paused_until
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+
+    def send(self, send_request: Callable[[], requests.Response]) -> requests.Response:
+        attempt = 0
+        while True:
+            self.acquire()
+            try:
+                resp = send_request()
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+                continue
+
+            if resp.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                resp.raise_for_status()
+                return resp
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            delay = retry_after if retry_after is not None else self.backoff(attempt)
+            print(f"Jira responded {resp.status_code} for {resp.url}, retrying in {delay:.1f}s...")
+            if resp.status_code == 429:
+                self.pause(delay)
+            else:
+                time.sleep(delay)
+
+            attempt += 1
+
+
+jira_scheduler = RequestScheduler(JIRA_REQUESTS_PER_SECOND, JIRA_REQUEST_BURST, max_retries=JIRA_MAX_RETRIES)
@@ -1,98 +1,90 @@
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from pendulum import parse
 from sqlalchemy import select
 
+from db.base import engine
+from db.ingest import upsert_sprints
 from db.session import Session
-from jira.references import JiraSquadID, SprintStatus
-from jira.ticket import count_tickets_by_category_and_project, fetch_sprint_tickets
+from jira.client import AGILE_SPRINT_PAGE_SIZE, jira_client
+from jira.pipeline import prefetch
+from jira.references import IngestMode, JiraSquadID, SprintStatus
+from jira.ticket import (
+    categorise_and_save_sprint_tickets,
+    categorise_and_save_squad_tickets,
+    fetch_sprint_issues,
+    fetch_sprint_tickets,
+    fetch_squad_done_issue_pages,
+)
 from models.sprint import Sprint
-from settings import JIRA_API_SECRET, JIRA_EMAIL
+from settings import JIRA_FETCH_CONCURRENCY
 
 
 def fetch_completed_sprints(squad_id: JiraSquadID) -> None:
-    count = 0
-    page_size = 50
-    all_sprints = []
-    while True:
-        params = {
-            "startAt": count,
-            "maxResults": page_size,
-            "state": SprintStatus.CLOSED,
-        }
-        resp = requests.get(
-            f"https://hellobink.atlassian.net/rest/agile/1.0/board/{squad_id}/sprint",
-            auth=(JIRA_EMAIL, JIRA_API_SECRET),
-            params=params,
-        )
-
-        sprints = resp.json()["values"]
-        all_sprints.extend(sprints)
-        count += page_size
-
-        if len(sprints) < page_size:
-            break
+    all_sprints = jira_client.paginate(
+        "GET",
+        f"/rest/agile/1.0/board/{squad_id}/sprint",
+        "values",
+        params={"state": SprintStatus.CLOSED.value},
+        page_size=AGILE_SPRINT_PAGE_SIZE,
+    )
+
+    stored_sprints_query = select(Sprint.jira_id).where(Sprint.squad_id == squad_id)
+    with Session() as session:
+        stored_sprint_ids = set(session.execute(stored_sprints_query).scalars().all())
 
     sprints_to_save = []
     for sprint in all_sprints:
+        if sprint["id"] in stored_sprint_ids:
+            continue
+
         if parse(sprint["startDate"]) > parse("2021-01-01") and sprint["endDate"]:
-            sprint_to_save = Sprint(
-                squad_id=squad_id,
-                jira_id=sprint["id"],
-                name=sprint["name"],
-                goal=sprint["goal"],
-                start_date=parse(sprint["startDate"]).to_datetime_string(),
-                end_date=parse(sprint["endDate"]).to_datetime_string(),
-                status=SprintStatus.CLOSED,
-            )
+            sprint_to_save = {
+                "squad_id": squad_id,
+                "jira_id": sprint["id"],
+                "name": sprint["name"],
+                "goal": sprint["goal"],
+                "start_date": parse(sprint["startDate"]).to_datetime_string(),
+                "end_date": parse(sprint["endDate"]).to_datetime_string(),
+                "status": SprintStatus.CLOSED,
+            }
             sprints_to_save.append(sprint_to_save)
 
-    with Session() as session:
-        session.add_all(sprints_to_save)
-        session.commit()
+    with engine.begin() as connection:
+        upsert_sprints(connection, sprints_to_save)
 
     return
 
 
-def fetch_sprints_and_sprint_tickets(squad_id: JiraSquadID) -> None:
+def fetch_sprints_and_sprint_tickets(
+    squad_id: JiraSquadID, concurrency: int = JIRA_FETCH_CONCURRENCY, ingest_mode: IngestMode = IngestMode.PER_SPRINT
+) -> None:
     print(f"Fetching sprints for project: {squad_id}")
 
     fetch_completed_sprints(squad_id)
     with Session() as session:
-        select_sprints_query = select(Sprint).filter(Sprint.status == SprintStatus.CLOSED, Sprint.squad_id == squad_id)
+        # Closed sprints never change, so only sprints whose tickets haven't been ingested yet need fetching
+        select_sprints_query = select(Sprint).filter(
+            Sprint.status == SprintStatus.CLOSED, Sprint.squad_id == squad_id, Sprint.tickets_carried_over.is_(None)
+        )
         sprints = session.execute(select_sprints_query).scalars().all()
 
     print("Fetched sprints, now fetching tickets...")
-    for sprint in sprints:
-        fetch_sprint_tickets(squad_id, sprint)
+    # One transaction for the whole squad rather than a commit per sprint
+    with engine.begin() as connection:
+        if ingest_mode == IngestMode.SQUAD_WIDE:
+            if sprints:
+                ticket_pages = prefetch(fetch_squad_done_issue_pages(squad_id, [sprint.jira_id for sprint in sprints]))
+                categorise_and_save_squad_tickets(ticket_pages, sprints, squad_id, connection)
+        elif concurrency > 1:
+            # Only the page fetches run on worker threads, all DB writes stay on this thread
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = {executor.submit(fetch_sprint_issues, squad_id, sprint.jira_id): sprint for sprint in sprints}
+                for future in as_completed(futures):
+                    categorise_and_save_sprint_tickets([future.result()], futures[future], squad_id, connection)
+        else:
+            for sprint in sprints:
+                fetch_sprint_tickets(squad_id, sprint, connection)
 
     print("Data is up to date!")
     return
-
-
-def catagorise_sprint_tickets(squad_id: int) -> list:
-    with Session() as session:
-        sprint_query = select(Sprint).where(Sprint.squad_id == squad_id)
-        completed_sprints = session.execute(sprint_query).scalars().all()
-
-    print("Collected sprint data, Now organising...")
-    squad_data = []
-    for sprint in completed_sprints:
-        sprint_info = {
-            "name": sprint.name,
-            "goal": sprint.goal,
-            "start_date": sprint.start_date,
-            "end_date": sprint.end_date,
-            "ticket_total": sprint.count_all_tickets(),
-            "ticket_carry_over_count": sprint.tickets_carried_over,
-            "user_story_count": sprint.count_tickets_by_type("user_story"),
-            "investigation_count": sprint.count_tickets_by_type("investigation"),
-            "bug_count": sprint.count_tickets_by_type("bug"),
-            "defect_count": sprint.defect_total,
-        }
-
-        ticket_list = sprint.get_all_tickets()
-        ticket_count_by_category_and_project = count_tickets_by_category_and_project(squad_id, ticket_list)
-        sprint_info.update(ticket_count_by_category_and_project)
-        squad_data.append(sprint_info)
-
-    return squad_data
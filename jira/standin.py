@@ -0,0 +1,108 @@
+"""Local stand-in for the Jira API, replaying fixtures captured with JIRA_RECORD_DIR.
+
+Run with `python -m jira.standin --fixtures <dir>` and set JIRA_BASE_URL to the address it prints.
+"""
+
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import click
+
+from jira.recorder import FixtureStore, collection_key
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Set by run_standin_server
+    store: FixtureStore
+    latency: float
+    page_size: int
+    throttle_rate: float
+    retry_after: int
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, body: dict, headers: dict = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def replay(self, params: dict, body: dict) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.throttle_rate and random.random() < self.throttle_rate:
+            self.send_json(429, {"errorMessages": ["Rate limit exceeded"]}, {"Retry-After": str(self.retry_after)})
+            return
+
+        path = urlsplit(self.path).path
+        collection = self.store.load(collection_key(self.command, path, params, body))
+        if not collection:
+            self.send_json(404, {"errorMessages": [f"No fixture recorded for {self.command} {self.path}"]})
+            return
+
+        paging = body if self.command == "POST" else params
+        start_at = int(paging.get("startAt", 0))
+        max_results = int(paging.get("maxResults", self.page_size))
+        if self.page_size:
+            max_results = min(max_results, self.page_size)
+
+        results = collection["results"]
+        response_body = {
+            "startAt": start_at,
+            "maxResults": max_results,
+            collection["results_key"]: results[start_at : start_at + max_results],
+        }
+        if collection["total"] is None:
+            response_body["isLast"] = start_at + max_results >= len(results)
+        else:
+            response_body["total"] = len(results)
+
+        self.send_json(200, response_body)
+
+    def do_GET(self):
+        self.replay(dict(parse_qsl(urlsplit(self.path).query)), {})
+
+    def do_POST(self):
+        content_length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(content_length) or b"{}")
+        self.replay({}, body)
+
+
+@click.command()
+@click.option("--fixtures", required=True, type=click.Path(exists=True, file_okay=False), help="Recorded fixture dir.")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8080, show_default=True)
+@click.option("--latency-ms", default=0, show_default=True, help="Delay added to every response.")
+@click.option("--page-size", default=0, show_default=True, help="Cap on maxResults, 0 keeps what the client asks for.")
+@click.option("--throttle-rate", default=0.0, show_default=True, help="Fraction of requests answered with a 429.")
+@click.option("--retry-after", default=1, show_default=True, help="Retry-After seconds sent with injected 429s.")
+def run_standin_server(
+    fixtures: str, host: str, port: int, latency_ms: int, page_size: int, throttle_rate: float, retry_after: int
+):
+    StandInHandler.store = FixtureStore(fixtures)
+    StandInHandler.latency = latency_ms / 1000
+    StandInHandler.page_size = page_size
+    StandInHandler.throttle_rate = throttle_rate
+    StandInHandler.retry_after = retry_after
+
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    print(f"Replaying Jira fixtures from {fixtures} on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    run_standin_server()
@@ -0,0 +1,33 @@
+import pendulum
+
+from db.sync import get_last_sync, update_last_sync
+from jira.backlog import fetch_backlog_tickets, sync_backlog_tickets
+from jira.references import IngestMode, JiraSquadID
+from jira.sprint import fetch_sprints_and_sprint_tickets
+from profiler import stage_profiler
+from settings import JIRA_FETCH_CONCURRENCY
+
+# JQL dates are read in the Jira user's timezone, so re-read a margin before the last sync to be safe. Re-synced
+# issues replace their stored copy, so the overlap only costs a few extra tickets.
+SYNC_OVERLAP = pendulum.duration(hours=24)
+
+
+def sync_squad(
+    squad_id: JiraSquadID, concurrency: int = JIRA_FETCH_CONCURRENCY, ingest_mode: IngestMode = IngestMode.PER_SPRINT
+) -> None:
+    synced_at = pendulum.now("UTC")
+    last_sync = get_last_sync(squad_id)
+
+    print(f"fetching {squad_id} sprint info...")
+    with stage_profiler.stage(squad_id, "sprint_fetch"):
+        fetch_sprints_and_sprint_tickets(squad_id, concurrency=concurrency, ingest_mode=ingest_mode)
+
+    with stage_profiler.stage(squad_id, "backlog_fetch"):
+        if last_sync:
+            print(f"syncing {squad_id} backlog changes since {last_sync.to_datetime_string()}...")
+            sync_backlog_tickets(squad_id, last_sync - SYNC_OVERLAP)
+        else:
+            print(f"fetching {squad_id} backlog info...")
+            fetch_backlog_tickets(squad_id)
+
+    update_last_sync(squad_id, synced_at)
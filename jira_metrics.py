@@ -1,56 +1,135 @@
-import shutil
+import json
 
 import click
 
+from db.base import create_db
 from db.cache import CacheIDs, is_cache_outdated, update_cache
-from excel import write_data_to_spreadsheet
-from jira.backlog import catagorise_backlog_tickets, fetch_backlog_tickets
-from jira.references import JiraSquadID
-from jira.sprint import catagorise_sprint_tickets, fetch_sprints_and_sprint_tickets
-from jira_enums import PROJECT_SPREADSHEETS, SPREADSHEET_BASE_DIR, JiraProjectID, Worksheets
+from exporters import EXPORTERS
+from instrumentation import run_metrics
+from jira.references import IngestMode, JiraSquadID
+from jira.sync import sync_squad
+from jira_enums import Worksheets
+from profiler import stage_profiler
 from projects import setup_projects_in_db
-from projects.custom_projects.trusted_channel import fetch_trusted_channel_information
+from projects.custom_projects.trusted_channel import (
+    fetch_trusted_channel_information,
+    load_trusted_channel_information,
+    save_trusted_channel_information,
+)
+from reports import render_squad_workbooks
+from settings import DB_PATH, JIRA_FETCH_CONCURRENCY, REPORT_WORKERS
+
+
+def check_export_formats(ctx: click.Context, param: click.Parameter, export_formats: tuple) -> tuple:
+    # Fail before anything is fetched rather than once the first squad's reports are written
+    for export_format in export_formats:
+        try:
+            EXPORTERS[export_format]().check_available()
+        except RuntimeError as err:
+            raise click.BadParameter(str(err)) from err
+
+    return export_formats
 
 
 @click.command()
-def fetch_all_data():
-    try:
-        shutil.rmtree(SPREADSHEET_BASE_DIR)
-    except FileNotFoundError:
-        pass
-
-    if is_cache_outdated(CacheIDs.SPRINT_REPORT):
-        print("Cache outdated... re-fetching data from Jira...")
+@click.option(
+    "--concurrency",
+    default=JIRA_FETCH_CONCURRENCY,
+    show_default=True,
+    help="Number of sprints to fetch from Jira in parallel.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Sync only what changed in Jira since the last run instead of rebuilding the DB.",
+)
+@click.option(
+    "--ingest-mode",
+    type=click.Choice([mode.value for mode in IngestMode]),
+    default=IngestMode.PER_SPRINT.value,
+    show_default=True,
+    help="squad-wide fetches each done issue once with a single search instead of listing every sprint.",
+)
+@click.option(
+    "--metrics-file",
+    type=click.Path(dir_okay=False),
+    help="Also write the run metrics here in the Prometheus text format, for the dashboard scraper.",
+)
+@click.option(
+    "--profile",
+    "profile_dir",
+    type=click.Path(file_okay=False),
+    help="Profile each stage with cProfile and tracemalloc, writing .pstats and allocation reports to this directory.",
+)
+@click.option(
+    "--report-workers",
+    default=REPORT_WORKERS,
+    show_default=True,
+    help="Number of processes rendering squad workbooks in parallel.",
+)
+@click.option(
+    "--export-format",
+    "export_formats",
+    multiple=True,
+    type=click.Choice(list(EXPORTERS)),
+    callback=check_export_formats,
+    help="Also export every report sheet to the exports directory in this format, can be given more than once.",
+)
+def fetch_all_data(
+    concurrency: int,
+    incremental: bool,
+    ingest_mode: str,
+    metrics_file: str,
+    profile_dir: str,
+    report_workers: int,
+    export_formats: tuple,
+):
+    if profile_dir:
+        stage_profiler.start(profile_dir)
+
+    if incremental:
+        print("Syncing changes from Jira...")
+        create_db()
+        refresh_data = True
+    else:
+        refresh_data = is_cache_outdated(CacheIDs.SPRINT_REPORT)
+        if refresh_data:
+            print("Cache outdated... re-fetching data from Jira...")
+
+    if refresh_data:
         setup_projects_in_db()
         for project in JiraSquadID:
-            print(f"fetching {project} sprint info...")
-            fetch_sprints_and_sprint_tickets(project)
-            print(f"fetching {project} backlog info...")
-            fetch_backlog_tickets(project)
+            with run_metrics.span(project, "fetch"):
+                sync_squad(project, concurrency=concurrency, ingest_mode=IngestMode(ingest_mode))
+
+        # Custom work
+        print("Starting custom scripts")
+        with run_metrics.span(JiraSquadID.BANK, "custom"), stage_profiler.stage(JiraSquadID.BANK, "trusted_channel"):
+            save_trusted_channel_information(fetch_trusted_channel_information())
 
         print("Refreshing cache update date...")
         update_cache(CacheIDs.SPRINT_REPORT)
 
+    trusted_channel_data = load_trusted_channel_information()
+
+    if report_workers > 1 and not DB_PATH:
+        print("Report workers need an on-disk DB_PATH to read from, rendering reports serially...")
+        report_workers = 1
+
     print("Starting ticket organisation...")
-    for project in JiraSquadID:
-        print(f"Organising {project} sprint info...")
-        squad_data = catagorise_sprint_tickets(project)
-        print("Data organised, writing to excel file...")
-        write_data_to_spreadsheet(squad_data, PROJECT_SPREADSHEETS[project], Worksheets.sprint)
-        print("Completed!")
-
-        print(f"Organising {project} backlog info...")
-        backlog_data = catagorise_backlog_tickets(project)
-        print("Data organised, writing to excel file...")
-        write_data_to_spreadsheet(backlog_data, PROJECT_SPREADSHEETS[project], Worksheets.backlog)
-        print("Completed!")
-
-    # Custom work
-    print("Starting custom scripts")
-    trusted_channel_data = fetch_trusted_channel_information()
-    write_data_to_spreadsheet(
-        trusted_channel_data, PROJECT_SPREADSHEETS[JiraProjectID.BANK], Worksheets.trusted_channels
+    render_squad_workbooks(
+        {JiraSquadID.BANK: {Worksheets.trusted_channels: trusted_channel_data}},
+        workers=report_workers,
+        profile_dir=profile_dir,
+        export_formats=export_formats,
     )
+    print("Completed!")
+
+    print("Run metrics:")
+    print(json.dumps(run_metrics.summary(), indent=2))
+    if metrics_file:
+        run_metrics.write_metrics_file(metrics_file)
+    stage_profiler.write_reports()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+from typing import Iterable
+
+from jira_enums import SPREADSHEET_BASE_DIR
+
+MANIFEST_PATH = os.path.join(SPREADSHEET_BASE_DIR, ".manifest.json")
+
+
+def rows_digest(rows: Iterable[dict]) -> str:
+    """Digest of a sheet's column names and row values, in order"""
+    digest = hashlib.sha256()
+    header = None
+    for row in rows:
+        if header is None:
+            header = list(row)
+            digest.update(json.dumps(header).encode())
+        digest.update(json.dumps(list(row.values()), default=str).encode())
+
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path: str = MANIFEST_PATH) -> dict:
+    """Output file path -> sheet digests it was last written from"""
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(manifest: dict, manifest_path: str = MANIFEST_PATH) -> None:
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+
+def is_unchanged(manifest: dict, file_path: str, digests: dict) -> bool:
+    return os.path.exists(file_path) and manifest.get(file_path) == digests
+
+
+def remove_stale_files(manifest: dict, produced_paths: Iterable[str]) -> list:
+    """Deletes the files in `manifest` that this run didn't produce, e.g. for a dropped board or export format.
+    Returns their paths."""
+    stale_paths = sorted(set(manifest) - set(produced_paths))
+    for file_path in stale_paths:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    return stale_paths
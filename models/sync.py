@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, Text
+
+from db.base import Base
+
+
+class SyncState(Base):
+    __tablename__ = "sync_state"
+
+    squad_id = Column(Integer, primary_key=True)
+    last_sync = Column(Text, nullable=False)
@@ -7,7 +7,7 @@ project_ticket = Table(
     "project_ticket",
     Base.metadata,
     Column("project_id", ForeignKey("project.id"), primary_key=True),
-    Column("ticket_id", ForeignKey("ticket.id"), primary_key=True),
+    Column("ticket_id", ForeignKey("ticket.id"), primary_key=True, index=True),
 )
 
 
@@ -17,16 +17,16 @@ class Ticket(Base):
     id = Column(Integer, primary_key=True)
     squad_id = Column(Integer, index=True)
     jira_id = Column(Integer)
-    jira_ref = Column(Text, unique=True)
+    jira_ref = Column(Text, index=True)
     ticket_type = Column(Text, nullable=False)
     ticket_created_date = Column(Text)
     story_points = Column(Integer, nullable=True)
     ticket_specific_completed_date = Column(Text, nullable=True)
     ticket_sprint_completed_date = Column(Text, nullable=True)
     sprint_id = Column(Integer, ForeignKey("sprint.id", ondelete="CASCADE"))
-    tech_labels = Column(Text, nullable=True)
-    product_labels = Column(Text, nullable=True)
-    project_labels = Column(Text, nullable=True)
+    # Bitmasks of jira.references.TechLabel / ProductLabel, project membership lives in project_ticket
+    tech_labels = Column(Integer, nullable=False, default=0)
+    product_labels = Column(Integer, nullable=False, default=0)
     refined = Column(Text)
     backlog = Column(Text)
 
@@ -0,0 +1,17 @@
+from sqlalchemy import Boolean, Column, Integer, Text
+
+from db.base import Base
+
+
+class TrustedChannelTicket(Base):
+    __tablename__ = "trusted_channel_ticket"
+
+    # Keeps the order tickets were fetched in
+    id = Column(Integer, primary_key=True)
+    key = Column(Text, nullable=False)
+    created_date = Column(Text)
+    completed_date = Column(Text, nullable=True)
+    done = Column(Boolean, nullable=False)
+    team = Column(Text, nullable=False)
+    dev_estimate_story_points = Column(Integer, nullable=True)
+    qa_estimate_story_total = Column(Integer, nullable=False)
@@ -0,0 +1,75 @@
+import cProfile
+import os
+import tracemalloc
+from contextlib import contextmanager
+from typing import Union
+
+TOP_ALLOCATIONS = 25
+
+
+class StageProfiler:
+    """cProfile and tracemalloc per pipeline stage, switched off unless `start` is called.
+
+    Repeated calls to the same stage accumulate into one profile. cProfile only sees the calling thread, so time
+    spent in Jira page fetches running on worker threads shows up as waiting on their results.
+    """
+
+    def __init__(self):
+        self.output_dir = None
+        self.profiles = {}
+        self.allocations = {}
+        self.peak_memory = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.output_dir is not None
+
+    def start(self, output_dir: str) -> None:
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        # Restarting clears the profiles of any earlier run
+        self.profiles = {}
+        self.allocations = {}
+        self.peak_memory = {}
+        tracemalloc.start()
+
+    @contextmanager
+    def stage(self, squad: Union[None, int], stage_name: str):
+        if not self.enabled:
+            yield
+            return
+
+        key = f"{getattr(squad, 'name', squad)}.{stage_name}".lower()
+        profile = self.profiles.setdefault(key, cProfile.Profile())
+        tracemalloc.reset_peak()
+        snapshot_before = tracemalloc.take_snapshot()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.peak_memory[key] = max(self.peak_memory.get(key, 0), tracemalloc.get_traced_memory()[1])
+            allocations = self.allocations.setdefault(key, {})
+            for stat in tracemalloc.take_snapshot().compare_to(snapshot_before, "lineno"):
+                line = str(stat.traceback[0])
+                size, count = allocations.get(line, (0, 0))
+                allocations[line] = (size + stat.size_diff, count + stat.count_diff)
+
+    def write_reports(self) -> None:
+        if not self.enabled:
+            return
+
+        for key, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(self.output_dir, f"{key}.pstats"))
+
+            top_allocations = sorted(self.allocations[key].items(), key=lambda item: item[1][0], reverse=True)
+            with open(os.path.join(self.output_dir, f"{key}.allocations.txt"), "w") as f:
+                f.write(f"Peak traced memory: {self.peak_memory[key] / 1024:,.1f} KiB\n")
+                f.write(f"Top {TOP_ALLOCATIONS} lines by memory still allocated at the end of the stage:\n")
+                for line, (size, count) in top_allocations[:TOP_ALLOCATIONS]:
+                    f.write(f"{size / 1024:>12,.1f} KiB {count:>+10,} blocks  {line}\n")
+
+        print(f"Wrote {len(self.profiles)} stage profiles to {self.output_dir}")
+
+
+stage_profiler = StageProfiler()
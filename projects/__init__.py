@@ -1,34 +1,30 @@
+from sqlalchemy import select
+
 from db.session import Session
-from jira.references import JiraSquadID
+from jira.references import TICKET_JIRA_FIELDS, JiraSquadID
+from jira.registry import squad_registry
 from models.ticket import Project
-from projects.bank import API2BankingMVP, API2ConsumerMVP, BankBase
-from projects.bpl import BPLBase
-from projects.merchant import MerchantBase
-from projects.mobile import MobileBase
-
-PROJECT_LIST = {
-    JiraSquadID.BANK: [
-        API2BankingMVP(),
-        API2ConsumerMVP(),
-    ],
-    JiraSquadID.BPL: [],
-    JiraSquadID.MERCHANT: [],
-    JiraSquadID.MOBILE: [],
-}
 
-SQUAD_BASE = {
-    JiraSquadID.BANK: BankBase,
-    JiraSquadID.BPL: BPLBase,
-    JiraSquadID.MERCHANT: MerchantBase,
-    JiraSquadID.MOBILE: MobileBase,
+SQUAD_JIRA_FIELDS = {
+    squad.id: list(dict.fromkeys([*TICKET_JIRA_FIELDS, *squad.jira_fields])) for squad in squad_registry.squads
 }
 
 
+def get_squad_jira_fields(squad_id: JiraSquadID) -> list:
+    return list(SQUAD_JIRA_FIELDS[squad_id])
+
+
 def setup_projects_in_db() -> None:
+    with Session() as session:
+        stored_project_names = set(session.execute(select(Project.name)).scalars().all())
+
     projects_to_save = []
-    for squad_id, project_list in PROJECT_LIST.items():
-        for project in project_list:
-            project_to_save = Project(jira_squad_id=squad_id, name=project.name)
+    for squad in squad_registry.squads:
+        for project in squad.projects:
+            if project.name in stored_project_names:
+                continue
+
+            project_to_save = Project(jira_squad_id=squad.id, name=project.name)
             projects_to_save.append(project_to_save)
 
     with Session() as session:
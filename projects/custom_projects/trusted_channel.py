@@ -1,7 +1,12 @@
 import pendulum
+from sqlalchemy import delete, insert, select
 
-from jira.board import fetch_board_tickets
+from db.base import engine
+from jira.board import fetch_board_ticket_pages
 from jira.references import LOY_STORY_POINT_JIRA_FIELD
+from models.trusted_channel import TrustedChannelTicket
+
+TRUSTED_CHANNEL_JIRA_FIELDS = ["status", "statuscategorychangedate", "created", LOY_STORY_POINT_JIRA_FIELD]
 
 
 def serialise_ticket_info(ticket_data: dict, team: str) -> dict:
@@ -37,10 +42,10 @@ def fetch_trusted_channel_information() -> list:
     trusted_channel_dev_jql = (
         'project = "LOY" ' "AND parent in (LOY-2666, LOY-2679, LOY-2684, LOY-2692, LOY-2703) " 'AND type = "Sub-task"'
     )
-    dev_tickets = fetch_board_tickets(trusted_channel_dev_jql)
-    for ticket_info in dev_tickets:
-        serialised_ticket = serialise_ticket_info(ticket_info, "dev")
-        csv_rows.append(serialised_ticket)
+    for dev_tickets in fetch_board_ticket_pages(trusted_channel_dev_jql, TRUSTED_CHANNEL_JIRA_FIELDS):
+        for ticket_info in dev_tickets:
+            serialised_ticket = serialise_ticket_info(ticket_info, "dev")
+            csv_rows.append(serialised_ticket)
 
     trusted_channel_qa_jql = (
         'project = "LOY" '
@@ -48,9 +53,24 @@ def fetch_trusted_channel_information() -> list:
         'AND type != "Sub-task"'
     )
 
-    qa_tickets = fetch_board_tickets(trusted_channel_qa_jql)
-    for ticket_info in qa_tickets:
-        serialised_ticket = serialise_ticket_info(ticket_info, "qa")
-        csv_rows.append(serialised_ticket)
+    for qa_tickets in fetch_board_ticket_pages(trusted_channel_qa_jql, TRUSTED_CHANNEL_JIRA_FIELDS):
+        for ticket_info in qa_tickets:
+            serialised_ticket = serialise_ticket_info(ticket_info, "qa")
+            csv_rows.append(serialised_ticket)
 
     return csv_rows
+
+
+def save_trusted_channel_information(rows: list) -> None:
+    """Replaces the stored trusted channel rows, so runs within the cache TTL report them without calling Jira"""
+    with engine.begin() as connection:
+        connection.execute(delete(TrustedChannelTicket))
+        if rows:
+            connection.execute(insert(TrustedChannelTicket), rows)
+
+
+def load_trusted_channel_information() -> list:
+    columns = [column for column in TrustedChannelTicket.__table__.columns if column.name != "id"]
+    with engine.connect() as connection:
+        result = connection.execute(select(*columns).order_by(TrustedChannelTicket.id))
+        return [dict(row) for row in result.mappings()]
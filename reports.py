@@ -0,0 +1,119 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Union
+
+from analytics import backlog_breakdown, load_ticket_table, sprint_breakdown, ticket_detail
+from excel import ReportWriter
+from exporters import EXPORTERS, export_rows
+from instrumentation import run_metrics
+from jira.references import JiraSquadID
+from jira.registry import squad_registry
+from jira_enums import EXPORT_BASE_DIR, Worksheets
+from manifest import is_unchanged, load_manifest, remove_stale_files, rows_digest, save_manifest
+from profiler import stage_profiler
+
+
+def render_squad_workbook(
+    squad_id: JiraSquadID, extra_sheets: dict, export_formats: tuple = (), manifest: dict = None
+) -> dict:
+    """Builds a squad's sprint, backlog and ticket reports from its ticket table and writes its workbook, with
+    `extra_sheets` appended.
+
+    Every sheet is also exported to EXPORT_BASE_DIR in each of `export_formats`. Files whose sheets are unchanged
+    since the run that wrote `manifest` are skipped. Returns the manifest entries for the squad's files.
+    """
+    manifest = manifest or {}
+    squad = squad_registry.get_squad(squad_id)
+    sheets = {}
+    print(f"Loading {squad_id} tickets...")
+    with run_metrics.span(squad_id, "aggregate"), stage_profiler.stage(squad_id, "ticket_table"):
+        ticket_table = load_ticket_table(squad_id)
+
+    print(f"Organising {squad_id} sprint, backlog and ticket info...")
+    with run_metrics.span(squad_id, "aggregate"), stage_profiler.stage(squad_id, "categorisation"):
+        sheets[Worksheets.sprint] = sprint_breakdown(ticket_table)
+        sheets[Worksheets.backlog] = backlog_breakdown(ticket_table)
+        sheets[Worksheets.tickets] = ticket_detail(ticket_table)
+
+    sheets.update(extra_sheets)
+
+    with run_metrics.span(squad_id, "excel"), stage_profiler.stage(squad_id, "spreadsheets"):
+        report_writer = ReportWriter(manifest=manifest)
+        for worksheet, rows in sheets.items():
+            report_writer.add_sheet(rows, squad.spreadsheet, worksheet)
+        if report_writer.write_workbook(squad.spreadsheet):
+            print(f"Wrote {squad_id} excel file")
+        else:
+            print(f"{squad_id} excel file is unchanged, skipping...")
+    manifest_updates = report_writer.manifest_updates
+
+    if export_formats:
+        print(f"Exporting {squad_id} reports as {', '.join(export_formats)}...")
+        with run_metrics.span(squad_id, "export"), stage_profiler.stage(squad_id, "exports"):
+            for worksheet, rows in sheets.items():
+                sheet_digests = {worksheet.value: rows_digest(rows)}
+                base_path = os.path.join(EXPORT_BASE_DIR, f"{squad.name.lower()}.{worksheet.value}")
+                for export_format in export_formats:
+                    export_path = f"{base_path}.{EXPORTERS[export_format].extension}"
+                    manifest_updates[export_path] = sheet_digests
+                    if not is_unchanged(manifest, export_path, sheet_digests):
+                        export_rows(rows, base_path, export_format)
+
+    return manifest_updates
+
+
+def init_report_worker(profile_dir: Union[None, str]) -> None:
+    if profile_dir:
+        stage_profiler.start(profile_dir)
+
+
+def render_squad_workbook_in_worker(
+    squad_id: JiraSquadID, extra_sheets: dict, export_formats: tuple, manifest: dict
+) -> tuple:
+    manifest_updates = render_squad_workbook(squad_id, extra_sheets, export_formats, manifest)
+    stage_profiler.write_reports()
+    return manifest_updates, run_metrics.take_spans()
+
+
+def render_squad_workbooks(
+    extra_sheets: dict, workers: int = 1, profile_dir: Union[None, str] = None, export_formats: tuple = ()
+) -> None:
+    """Renders every squad's workbook, in `workers` processes reading the on-disk store when more than one.
+
+    Only the parent process touches the manifest, workers hand their entries back. Files the manifest lists that this
+    run didn't produce are deleted.
+    """
+    manifest = load_manifest()
+    manifest_updates = {}
+    if workers <= 1:
+        for squad_id in JiraSquadID:
+            manifest_updates.update(
+                render_squad_workbook(squad_id, extra_sheets.get(squad_id, {}), export_formats, manifest)
+            )
+    else:
+        # Spawned rather than forked, by now the parent has live Jira page fetch threads whose locks a fork could copy
+        # mid-acquire. Each worker starts fresh and opens its own connections to the on-disk store.
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(JiraSquadID)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_report_worker,
+            initargs=(profile_dir,),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    render_squad_workbook_in_worker, squad_id, extra_sheets.get(squad_id, {}), export_formats, manifest
+                )
+                for squad_id in JiraSquadID
+            ]
+            for future in futures:
+                squad_manifest_updates, spans = future.result()
+                manifest_updates.update(squad_manifest_updates)
+                run_metrics.merge_spans(spans)
+
+    # The manifest only ever lists what the latest run wrote, anything else is left over from an older config
+    stale_paths = remove_stale_files(manifest, manifest_updates)
+    for file_path in stale_paths:
+        print(f"Removed {file_path}, no longer produced")
+    if stale_paths or any(manifest.get(file_path) != digests for file_path, digests in manifest_updates.items()):
+        save_manifest(manifest_updates)
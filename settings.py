@@ -1,3 +1,5 @@
+import os
+
 from environment import getenv, read_env
 
 read_env()
@@ -5,3 +7,26 @@ read_env()
 
 JIRA_EMAIL = getenv("JIRA_EMAIL")
 JIRA_API_SECRET = getenv("JIRA_API_SECRET")
+# Point at a local `python -m jira.standin` server to replay recorded responses offline
+JIRA_BASE_URL = getenv("JIRA_BASE_URL", default="https://hellobink.atlassian.net")
+# When set, every Jira response is captured into gzipped fixtures in this directory
+JIRA_RECORD_DIR = getenv("JIRA_RECORD_DIR", default="")
+# Boards, projects, matching and refinement rules and Jira custom field ids
+SQUAD_CONFIG_PATH = getenv("SQUAD_CONFIG_PATH", default=os.path.join(os.path.dirname(__file__), "squads.json"))
+
+JIRA_POOL_SIZE = getenv("JIRA_POOL_SIZE", default="10", conv=int)
+JIRA_FETCH_CONCURRENCY = getenv("JIRA_FETCH_CONCURRENCY", default="1", conv=int)
+JIRA_PAGE_CONCURRENCY = getenv("JIRA_PAGE_CONCURRENCY", default="4", conv=int)
+JIRA_MAX_IN_FLIGHT_PAGES = getenv("JIRA_MAX_IN_FLIGHT_PAGES", default="8", conv=int)
+JIRA_REQUESTS_PER_SECOND = getenv("JIRA_REQUESTS_PER_SECOND", default="10", conv=float)
+JIRA_REQUEST_BURST = getenv("JIRA_REQUEST_BURST", default="10", conv=int)
+JIRA_REQUEST_TIMEOUT = getenv("JIRA_REQUEST_TIMEOUT", default="30", conv=float)
+JIRA_MAX_RETRIES = getenv("JIRA_MAX_RETRIES", default="5", conv=int)
+
+# Worker processes rendering squad workbooks in parallel, 1 renders them one after another
+REPORT_WORKERS = getenv("REPORT_WORKERS", default="1", conv=int)
+
+# Leave DB_PATH empty to keep the store in memory for a single run
+DB_PATH = getenv("DB_PATH", default="jira_metrics.sqlite3")
+DB_CACHE_SIZE_KB = getenv("DB_CACHE_SIZE_KB", default="65536", conv=int)
+DB_MMAP_SIZE = getenv("DB_MMAP_SIZE", default="268435456", conv=int)
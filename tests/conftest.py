@@ -0,0 +1,63 @@
+import os
+
+# Settings are read at import time, so tests get an in-memory store and dummy credentials before anything imports them
+os.environ["DB_PATH"] = ""
+os.environ.setdefault("JIRA_EMAIL", "test@example.com")
+os.environ.setdefault("JIRA_API_SECRET", "test")
+
+import pytest  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+import db.cache  # noqa: E402, F401 - registers every table with Base before recreate_db
+import db.sync  # noqa: E402, F401
+import models.trusted_channel  # noqa: E402, F401
+from benchmarks.payloads import build_squad_payloads  # noqa: E402
+from db.base import engine, recreate_db  # noqa: E402
+from db.ingest import upsert_sprints  # noqa: E402
+from db.session import Session  # noqa: E402
+from jira.backlog import categorise_and_save_backlog_tickets  # noqa: E402
+from jira.references import JiraSquadID, SprintStatus  # noqa: E402
+from jira.ticket import categorise_and_save_sprint_tickets  # noqa: E402
+from models.sprint import Sprint  # noqa: E402
+from projects import setup_projects_in_db  # noqa: E402
+
+
+@pytest.fixture
+def store():
+    recreate_db()
+    setup_projects_in_db()
+
+
+def ingest_squad(squad_id: JiraSquadID, sprint_count: int, issues_per_sprint: int, backlog_issues: int) -> dict:
+    payloads = build_squad_payloads(squad_id, sprint_count, issues_per_sprint, backlog_issues)
+    sprint_rows = [
+        {
+            "squad_id": squad_id,
+            "jira_id": sprint["id"],
+            "name": sprint["name"],
+            "goal": sprint["goal"],
+            "start_date": sprint["startDate"],
+            "end_date": sprint["endDate"],
+            "status": SprintStatus.CLOSED,
+        }
+        for sprint in payloads["sprints"]
+    ]
+    with engine.begin() as connection:
+        upsert_sprints(connection, sprint_rows)
+
+    with Session() as session:
+        sprints = session.execute(select(Sprint).where(Sprint.squad_id == squad_id)).scalars().all()
+
+    with engine.begin() as connection:
+        for sprint in sprints:
+            categorise_and_save_sprint_tickets(
+                [payloads["sprint_issues"][sprint.jira_id]], sprint, squad_id, connection
+            )
+        categorise_and_save_backlog_tickets([payloads["backlog"]], squad_id, connection)
+
+    return payloads
+
+
+@pytest.fixture
+def bank_store(store):
+    return ingest_squad(JiraSquadID.BANK, sprint_count=3, issues_per_sprint=10, backlog_issues=12)
@@ -0,0 +1,39 @@
+import analytics
+from analytics import backlog_breakdown, load_ticket_table, sprint_breakdown, ticket_detail
+from jira.references import JiraSquadID
+
+
+def test_empty_squad_reports(store):
+    ticket_table = load_ticket_table(JiraSquadID.BPL)
+
+    assert len(ticket_table) == 0
+    assert sprint_breakdown(ticket_table) == []
+    assert backlog_breakdown(ticket_table)[0]["ticket_total"] == 0
+    assert list(ticket_detail(ticket_table)) == []
+
+
+def test_ticket_detail_has_a_row_per_ticket(bank_store):
+    ticket_table = load_ticket_table(JiraSquadID.BANK)
+    tickets = list(ticket_detail(ticket_table))
+
+    assert len(tickets) == len(ticket_table)
+    assert all(ticket["created_date"] for ticket in tickets)
+    backlog_tickets = [ticket for ticket in tickets if ticket["backlog"]]
+    assert backlog_tickets and all(ticket["completed_date"] is None for ticket in backlog_tickets)
+    sprint_ticket_total = sum(sprint["ticket_total"] for sprint in sprint_breakdown(ticket_table))
+    assert sprint_ticket_total == len(tickets) - len(backlog_tickets)
+    backlog = backlog_breakdown(ticket_table)[0]
+    assert backlog["ticket_total"] == len(backlog_tickets)
+    # A plain int, so every export format writes the same squad value
+    assert type(backlog["squad"]) is int and backlog["squad"] == JiraSquadID.BANK.value
+
+
+def test_ticket_detail_rebuilds_rows_in_chunks_on_every_pass(bank_store, monkeypatch):
+    ticket_table = load_ticket_table(JiraSquadID.BANK)
+    tickets = list(ticket_detail(ticket_table))
+    monkeypatch.setattr(analytics, "TICKET_DETAIL_CHUNK_SIZE", 7)
+    ticket_rows = ticket_detail(ticket_table)
+
+    assert len(ticket_rows) == len(tickets)
+    assert list(ticket_rows) == tickets
+    assert list(ticket_rows) == tickets
@@ -0,0 +1,33 @@
+from openpyxl import load_workbook
+
+from excel import ReportWriter
+from jira_enums import Worksheets
+
+ROWS = [{"name": "Sprint 1", "ticket_total": 4}, {"name": "Sprint 2", "ticket_total": 7}]
+
+
+class CountingRows:
+    def __init__(self):
+        self.passes = 0
+
+    def __iter__(self):
+        self.passes += 1
+        return iter(ROWS)
+
+
+def test_write_workbook_reads_every_kind_of_row_source(tmp_path):
+    counting_rows = CountingRows()
+    report_writer = ReportWriter(str(tmp_path))
+    report_writer.add_sheet(counting_rows, "bank.xlsx", Worksheets.sprint)
+    report_writer.add_sheet((row for row in ROWS), "bank.xlsx", Worksheets.backlog)
+
+    assert report_writer.write_workbook("bank.xlsx")
+    # Re-iterable rows aren't copied, they're read once for the digest and once for the sheet
+    assert counting_rows.passes == 2
+    workbook = load_workbook(tmp_path / "bank.xlsx")
+    for worksheet in [Worksheets.sprint, Worksheets.backlog]:
+        assert list(workbook[worksheet.value].iter_rows(values_only=True)) == [
+            ("name", "ticket_total"),
+            ("Sprint 1", 4),
+            ("Sprint 2", 7),
+        ]
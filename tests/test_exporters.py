@@ -0,0 +1,84 @@
+import csv
+import json
+import os
+
+import pytest
+
+import exporters
+from exporters import EXPORTERS, export_rows
+from jira.references import JiraSquadID
+
+ROWS = [
+    {"jira_ref": "K-1", "story_points": 3, "labels": None},
+    {"jira_ref": "K-2", "story_points": None, "labels": "security"},
+    {"jira_ref": "K-3", "story_points": 0.5, "labels": "devops"},
+]
+
+
+def test_csv_export(tmp_path):
+    path = export_rows(iter(ROWS), os.path.join(tmp_path, "bank.tickets"), "csv")
+
+    assert path.endswith("bank.tickets.csv")
+    with open(path, newline="") as f:
+        assert list(csv.reader(f)) == [
+            ["jira_ref", "story_points", "labels"],
+            ["K-1", "3", ""],
+            ["K-2", "", "security"],
+            ["K-3", "0.5", "devops"],
+        ]
+
+
+def test_jsonl_export(tmp_path):
+    path = export_rows(iter(ROWS), os.path.join(tmp_path, "bank.tickets"), "jsonl")
+
+    with open(path) as f:
+        assert [json.loads(line) for line in f] == ROWS
+
+
+@pytest.mark.parametrize("export_format", list(EXPORTERS))
+def test_export_of_no_rows(tmp_path, export_format):
+    path = os.path.join(tmp_path, f"empty.{export_format}")
+
+    assert EXPORTERS[export_format]().export(iter(()), path) == 0
+    assert os.path.exists(path)
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 10000])
+def test_parquet_export_keeps_every_batch_lossless(tmp_path, monkeypatch, batch_size):
+    pq = pytest.importorskip("pyarrow.parquet")
+    # Small batches put the all None labels and the whole number points in a batch of their own
+    monkeypatch.setattr(exporters, "PARQUET_BATCH_SIZE", batch_size)
+    path = os.path.join(tmp_path, "bank.tickets.parquet")
+
+    assert EXPORTERS["parquet"]().export(iter(ROWS), path) == len(ROWS)
+    table = pq.read_table(path)
+    assert table.column_names == ["jira_ref", "story_points", "labels"]
+    assert table.to_pylist() == ROWS
+
+
+def test_parquet_export_rejects_incompatible_types(tmp_path, monkeypatch):
+    pa = pytest.importorskip("pyarrow")
+    monkeypatch.setattr(exporters, "PARQUET_BATCH_SIZE", 1)
+
+    with pytest.raises(pa.ArrowTypeError):
+        EXPORTERS["parquet"]().export([{"goal": 1}, {"goal": "ship it"}], os.path.join(tmp_path, "bad.parquet"))
+
+
+def read_export(path: str, export_format: str) -> list:
+    if export_format == "csv":
+        with open(path, newline="") as f:
+            return [{column: int(value) for column, value in row.items()} for row in csv.DictReader(f)]
+    if export_format == "jsonl":
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    return pytest.importorskip("pyarrow.parquet").read_table(path).to_pylist()
+
+
+@pytest.mark.parametrize("export_format", list(EXPORTERS))
+def test_squad_ids_export_as_their_value(tmp_path, export_format):
+    path = export_rows(
+        iter([{"squad": JiraSquadID.BANK, "ticket_total": 26}]), os.path.join(tmp_path, "bank.backlog"), export_format
+    )
+
+    assert read_export(path, export_format) == [{"squad": JiraSquadID.BANK.value, "ticket_total": 26}]
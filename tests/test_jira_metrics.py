@@ -0,0 +1,73 @@
+import sys
+
+import pytest
+from click.testing import CliRunner
+from openpyxl import load_workbook
+
+import jira_metrics
+from db.cache import CacheIDs, update_cache
+from jira.references import JiraSquadID
+from jira.registry import squad_registry
+from jira_enums import SPREADSHEET_BASE_DIR, Worksheets
+from projects.custom_projects.trusted_channel import load_trusted_channel_information, save_trusted_channel_information
+
+TRUSTED_CHANNEL_ROWS = [
+    {
+        "key": "LOY-3001",
+        "created_date": "2022-03-01 10:00:00",
+        "completed_date": "2022-03-04 10:00:00",
+        "done": True,
+        "team": "dev",
+        "dev_estimate_story_points": 3,
+        "qa_estimate_story_total": 0,
+    },
+    {
+        "key": "LOY-3002",
+        "created_date": "2022-03-02 10:00:00",
+        "completed_date": None,
+        "done": False,
+        "team": "qa",
+        "dev_estimate_story_points": 0,
+        "qa_estimate_story_total": 1,
+    },
+]
+
+
+def fail_if_called(*args, **kwargs):
+    pytest.fail("Ran before the options were checked")
+
+
+def test_parquet_export_needs_pyarrow_up_front(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    # Nothing is fetched, the option is rejected as it is parsed
+    monkeypatch.setattr(jira_metrics, "sync_squad", fail_if_called)
+
+    result = CliRunner().invoke(jira_metrics.fetch_all_data, ["--export-format", "parquet"])
+
+    assert result.exit_code == 2
+    assert "Parquet exports need pyarrow" in result.output
+    assert isinstance(result.exception, SystemExit)
+
+
+def test_trusted_channel_rows_round_trip(store):
+    save_trusted_channel_information(TRUSTED_CHANNEL_ROWS)
+    save_trusted_channel_information(TRUSTED_CHANNEL_ROWS[1:])
+
+    assert load_trusted_channel_information() == TRUSTED_CHANNEL_ROWS[1:]
+
+
+def test_rerun_within_cache_ttl_skips_jira(store, tmp_path, monkeypatch):
+    save_trusted_channel_information(TRUSTED_CHANNEL_ROWS)
+    update_cache(CacheIDs.SPRINT_REPORT)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(jira_metrics, "sync_squad", fail_if_called)
+    monkeypatch.setattr(jira_metrics, "fetch_trusted_channel_information", fail_if_called)
+
+    result = CliRunner().invoke(jira_metrics.fetch_all_data, [], catch_exceptions=False)
+
+    assert result.exit_code == 0
+    spreadsheet = squad_registry.get_squad(JiraSquadID.BANK).spreadsheet
+    workbook = load_workbook(tmp_path / SPREADSHEET_BASE_DIR / spreadsheet)
+    trusted_channel_rows = list(workbook[Worksheets.trusted_channels.value].iter_rows(values_only=True))
+    assert trusted_channel_rows[0] == tuple(TRUSTED_CHANNEL_ROWS[0])
+    assert [row[0] for row in trusted_channel_rows[1:]] == ["LOY-3001", "LOY-3002"]
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from excel import ReportWriter
+from jira.registry import squad_registry
+from jira_enums import EXPORT_BASE_DIR, SPREADSHEET_BASE_DIR, Worksheets
+from manifest import MANIFEST_PATH, load_manifest, remove_stale_files, rows_digest, save_manifest
+from reports import render_squad_workbooks
+
+ROWS = [{"name": "Sprint 1", "ticket_total": 4}, {"name": "Sprint 2", "ticket_total": 7}]
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # Report and manifest paths are relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write_workbook(manifest: dict, rows: list) -> tuple:
+    report_writer = ReportWriter(manifest=manifest)
+    report_writer.add_sheet(iter(rows), "bank.xlsx", Worksheets.sprint)
+    return report_writer.write_workbook("bank.xlsx"), report_writer.manifest_updates
+
+
+def test_rows_digest_covers_columns_and_values():
+    assert rows_digest(ROWS) == rows_digest(list(ROWS))
+    assert rows_digest(ROWS) != rows_digest(ROWS[:1])
+    assert rows_digest(ROWS) != rows_digest([{"sprint": "Sprint 1", "ticket_total": 4}, ROWS[1]])
+
+
+def test_manifest_round_trip(workdir):
+    assert load_manifest() == {}
+    save_manifest({"spreadsheets/bank.xlsx": {"sprint": "abc"}})
+
+    assert load_manifest() == {"spreadsheets/bank.xlsx": {"sprint": "abc"}}
+
+
+def test_unchanged_workbook_is_skipped(workdir):
+    wrote, manifest = write_workbook({}, ROWS)
+    workbook_path = os.path.join(SPREADSHEET_BASE_DIR, "bank.xlsx")
+    os.utime(workbook_path, (0, 0))
+
+    wrote_again, manifest_again = write_workbook(manifest, ROWS)
+
+    assert (wrote, wrote_again) == (True, False)
+    assert manifest_again == manifest
+    assert os.path.getmtime(workbook_path) == 0
+
+
+def test_changed_or_missing_workbook_is_rewritten(workdir):
+    _, manifest = write_workbook({}, ROWS)
+
+    assert write_workbook(manifest, ROWS[:1])[0]
+    os.remove(os.path.join(SPREADSHEET_BASE_DIR, "bank.xlsx"))
+    assert write_workbook(manifest, ROWS)[0]
+
+
+def test_remove_stale_files(workdir):
+    os.makedirs(EXPORT_BASE_DIR)
+    for file_name in ["kept.csv", "stale.csv"]:
+        with open(os.path.join(EXPORT_BASE_DIR, file_name), "w"):
+            pass
+    kept_path, stale_path, missing_path = (
+        os.path.join(EXPORT_BASE_DIR, file_name) for file_name in ["kept.csv", "stale.csv", "missing.csv"]
+    )
+    manifest = {kept_path: {}, stale_path: {}, missing_path: {}}
+
+    assert remove_stale_files(manifest, [kept_path]) == [missing_path, stale_path]
+    assert os.path.exists(kept_path)
+    assert not os.path.exists(stale_path)
+
+
+def test_rendering_prunes_files_it_no_longer_produces(store, workdir):
+    render_squad_workbooks({}, export_formats=("csv",))
+    squad = squad_registry.squads[0]
+    export_path = os.path.join(EXPORT_BASE_DIR, f"{squad.name.lower()}.{Worksheets.sprint.value}.csv")
+    dropped_board_path = os.path.join(SPREADSHEET_BASE_DIR, "dropped_board.xlsx")
+    with open(dropped_board_path, "w"):
+        pass
+    save_manifest({**load_manifest(), dropped_board_path: {"sprint": "abc"}})
+    assert os.path.exists(export_path)
+
+    # Dropping the csv export format, with a workbook left over from a board no longer in the config
+    render_squad_workbooks({})
+
+    manifest = load_manifest()
+    assert not os.path.exists(export_path)
+    assert not os.path.exists(dropped_board_path)
+    assert set(manifest) == {os.path.join(SPREADSHEET_BASE_DIR, squad.spreadsheet) for squad in squad_registry.squads}
+    assert all(os.path.exists(file_path) for file_path in manifest)
+    assert os.path.exists(MANIFEST_PATH)
@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import select
+
+from analytics import load_ticket_table
+from db.base import QueryBudgetExceeded, QueryCounter, query_budget
+from db.session import Session
+from jira.references import JiraSquadID
+from jira.ticket import get_squad_projects
+from models.ticket import Ticket
+
+
+def test_query_counter_counts_statements(store):
+    with QueryCounter() as counter:
+        with Session() as session:
+            session.execute(select(Ticket.id)).all()
+            session.execute(select(Ticket.jira_ref)).all()
+
+    assert counter.count == 2
+
+
+def test_query_budget_fails_block_over_budget(store):
+    with pytest.raises(QueryBudgetExceeded, match="budget is 1"):
+        with query_budget(1):
+            get_squad_projects(JiraSquadID.BANK)
+            get_squad_projects(JiraSquadID.BPL)
+
+
+def test_query_budget_decorator_counts_each_call(store):
+    @query_budget(1)
+    def load_projects():
+        return get_squad_projects(JiraSquadID.BANK)
+
+    load_projects()
+    load_projects()
+
+
+def test_load_ticket_table_is_set_based(bank_store):
+    # The budget doesn't grow with the number of sprints or tickets
+    with query_budget(4) as counter:
+        ticket_table = load_ticket_table(JiraSquadID.BANK)
+
+    assert len(ticket_table) > 0
+    assert counter.count == 4
+
+
+def test_load_ticket_table_for_empty_squad_is_set_based(store):
+    with query_budget(4):
+        load_ticket_table(JiraSquadID.BPL)
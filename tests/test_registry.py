@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from jira.registry import ConfigError, load_registry
+from settings import SQUAD_CONFIG_PATH
+
+
+@pytest.fixture
+def squad_config():
+    with open(SQUAD_CONFIG_PATH) as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    def write_config(config: dict) -> str:
+        config_path = os.path.join(tmp_path, "squads.json")
+        with open(config_path, "w") as f:
+            json.dump(config, f)
+        return config_path
+
+    return write_config
+
+
+def test_loads_shipped_config(squad_config, write_config):
+    registry = load_registry(write_config(squad_config))
+
+    assert [squad.id for squad in registry.squads] == [board["id"] for board in squad_config["boards"]]
+    first_board = squad_config["boards"][0]
+    assert registry.get_squad(first_board["id"]).spreadsheet == first_board["spreadsheet"]
+
+
+@pytest.mark.parametrize("field", ["id", "name", "spreadsheet"])
+def test_rejects_duplicate_boards(squad_config, write_config, field):
+    squad_config["boards"][1][field] = squad_config["boards"][0][field]
+
+    with pytest.raises(ConfigError, match="Duplicate board"):
+        load_registry(write_config(squad_config))
+
+
+def test_rejects_spreadsheets_differing_only_in_case(squad_config, write_config):
+    squad_config["boards"][1]["spreadsheet"] = squad_config["boards"][0]["spreadsheet"].upper()
+
+    with pytest.raises(ConfigError, match="Duplicate board spreadsheet"):
+        load_registry(write_config(squad_config))
+
+
+@pytest.mark.parametrize(
+    "refinement", [{}, {"field": "customfield_1", "unrefined_sprint": "ready for refinement"}], ids=["none", "both"]
+)
+def test_rejects_ambiguous_refinement(squad_config, write_config, refinement):
+    squad_config["boards"][0]["refinement"] = refinement
+
+    with pytest.raises(ConfigError, match="exactly one of refinement"):
+        load_registry(write_config(squad_config))
+
+
+def test_rejects_duplicate_project_names(squad_config, write_config):
+    board = next(board for board in squad_config["boards"] if board["projects"])
+    board["projects"].append(dict(board["projects"][0]))
+
+    with pytest.raises(ConfigError, match="duplicate project names"):
+        load_registry(write_config(squad_config))
+
+
+def test_rejects_unknown_match_rules(squad_config, write_config):
+    board = next(board for board in squad_config["boards"] if board["projects"])
+    board["projects"][0]["match"]["labels"] = ["api"]
+
+    with pytest.raises(ConfigError, match="unsupported match rules"):
+        load_registry(write_config(squad_config))
+
+
+def test_rejects_unknown_technical_label_categories(squad_config, write_config):
+    squad_config["technical_labels"]["chaos"] = "mayhem"
+
+    with pytest.raises(ConfigError, match="Unknown technical label categories"):
+        load_registry(write_config(squad_config))
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from jira import scheduler
+from jira.scheduler import RequestScheduler, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler, "time", SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep))
+    return clock
+
+
+def make_response(status_code: int, headers: dict = None) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp.headers.update(headers or {})
+    resp.url = "https://jira.example/rest/agile/1.0/board/1/sprint"
+    return resp
+
+
+def respond_with(*responses):
+    responses = iter(responses)
+    return lambda: next(responses)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_is_jittered_exponential_and_capped(monkeypatch):
+    monkeypatch.setattr(scheduler.random, "uniform", lambda low, high: high)
+    request_scheduler = RequestScheduler(rate=0, burst=1, backoff_base=1.0, backoff_cap=10.0)
+
+    assert [request_scheduler.backoff(attempt) for attempt in range(5)] == [1.0, 2.0, 4.0, 8.0, 10.0]
+
+
+def test_429_pauses_every_request_for_retry_after(clock):
+    request_scheduler = RequestScheduler(rate=1, burst=1)
+    resp = request_scheduler.send(respond_with(make_response(429, {"Retry-After": "3"}), make_response(200)))
+
+    assert resp.status_code == 200
+    # The pause holds back every caller, not just the one that was throttled, and empties the bucket
+    assert request_scheduler.paused_until == 3
+    assert clock.now == 4
+
+
+def test_server_errors_back_off_then_succeed(clock, monkeypatch):
+    monkeypatch.setattr(scheduler.random, "uniform", lambda low, high: high)
+    request_scheduler = RequestScheduler(rate=0, burst=1, backoff_base=0.5)
+    resp = request_scheduler.send(respond_with(make_response(503), make_response(502), make_response(200)))
+
+    assert resp.status_code == 200
+    assert clock.sleeps == [0.5, 1.0]
+
+
+def test_gives_up_after_max_retries(clock):
+    request_scheduler = RequestScheduler(rate=0, burst=1, max_retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        request_scheduler.send(respond_with(*[make_response(503)] * 3))
+    assert len(clock.sleeps) == 2
+
+
+def test_connection_errors_are_retried(clock):
+    attempts = []
+
+    def send_request():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise requests.ConnectionError()
+        return make_response(200)
+
+    assert RequestScheduler(rate=0, burst=1).send(send_request).status_code == 200
+    assert len(attempts) == 2